@@ -0,0 +1,64 @@
+"""
+Bech32 encode/decode with a table-driven checksum
+Drop-in for bech32.bech32_encode / bech32.bech32_decode (same inputs, same
+results); the reference polymod runs five conditional XORs per symbol, here
+the XOR of generators for each 5-bit top value is precomputed once.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_CHARSET_INDEX = {c: i for i, c in enumerate(CHARSET)}
+
+_GENERATOR = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+
+# _POLYMOD_TABLE[top] == XOR of _GENERATOR[i] for every bit i set in top
+_POLYMOD_TABLE = tuple(
+    (-(top & 1) & _GENERATOR[0])
+    ^ (-((top >> 1) & 1) & _GENERATOR[1])
+    ^ (-((top >> 2) & 1) & _GENERATOR[2])
+    ^ (-((top >> 3) & 1) & _GENERATOR[3])
+    ^ (-((top >> 4) & 1) & _GENERATOR[4])
+    for top in range(32)
+)
+
+
+def _polymod(values: Iterable[int]) -> int:
+    """Compute the Bech32 checksum polymod"""
+    table = _POLYMOD_TABLE
+    chk = 1
+    for value in values:
+        chk = ((chk & 0x1ffffff) << 5) ^ value ^ table[chk >> 25]
+    return chk
+
+
+def _hrp_expand(hrp: str) -> List[int]:
+    """Expand the HRP into values for checksum computation"""
+    return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
+
+
+def bech32_encode(hrp: str, data: Iterable[int]) -> str:
+    """Compute a Bech32 string given HRP and 5-bit data values"""
+    data = list(data)
+    polymod = _polymod(_hrp_expand(hrp) + data + [0, 0, 0, 0, 0, 0]) ^ 1
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + "1" + "".join([CHARSET[d] for d in data + checksum])
+
+
+def bech32_decode(bech: str) -> Tuple[Optional[str], Optional[List[int]]]:
+    """Validate a Bech32 string and return (hrp, data), or (None, None)"""
+    if any(ord(x) < 33 or ord(x) > 126 for x in bech) or (
+        bech.lower() != bech and bech.upper() != bech
+    ):
+        return (None, None)
+    bech = bech.lower()
+    pos = bech.rfind("1")
+    if pos < 1 or pos > 83 or pos + 7 > len(bech):
+        return (None, None)
+    try:
+        data = [_CHARSET_INDEX[x] for x in bech[pos + 1:]]
+    except KeyError:
+        return (None, None)
+    hrp = bech[:pos]
+    if _polymod(_hrp_expand(hrp) + data) != 1:
+        return (None, None)
+    return (hrp, data[:-6])
@@ -7,15 +7,14 @@ Scrapes APR data from Keplr wallet with multi-tier caching
 import asyncio
 import aiohttp
 import re
-import json
 import time
-from typing import Dict, Optional, List
+import random
+import orjson
+from typing import Dict, Optional, List, Tuple
 from pathlib import Path
 import logging
-from playwright.async_api import async_playwright, Page, Browser
-import sys
+from playwright.async_api import async_playwright, Page, Browser, TimeoutError as PlaywrightTimeoutError
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config_loader import config
 
 logger = logging.getLogger(__name__)
@@ -23,36 +22,105 @@ logger = logging.getLogger(__name__)
 # Global lock to ensure only ONE scraping operation at a time across all instances
 _global_scraping_lock = asyncio.Lock()
 
+# Matches an APR percentage such as "16.8%" or "16.8 %"
+_APR_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+
+# Primary XPath selector for the APR value on a Keplr chain page
+_KEPLR_APR_XPATH = "//*[@id='__next']/div[2]/div[2]/div/div[1]/div/div[2]/div/div/div/div[1]/div[2]/p"
+
+# Fallback CSS selectors tried when the primary XPath node has no APR
+_KEPLR_ALT_SELECTORS = "[data-testid*='apr'], .apr-value, .staking-apr"
+
+# In-page extractor: checks the primary XPath node, then every alternative
+# selector, and returns the first APR found (or null) in one CDP roundtrip
+_EXTRACT_APR_JS = """
+() => {
+    const re = new RegExp(%s);
+    const primary = document.evaluate(
+        %s, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    if (primary) {
+        const m = primary.innerText.match(re);
+        if (m) return parseFloat(m[1]);
+    }
+    for (const el of document.querySelectorAll(%s)) {
+        const m = el.innerText.match(re);
+        if (m) {
+            const value = parseFloat(m[1]);
+            if (value > 0 && value < 100) return value;
+        }
+    }
+    return null;
+}
+""" % (
+    orjson.dumps(_APR_RE.pattern).decode(),
+    orjson.dumps(_KEPLR_APR_XPATH).decode(),
+    orjson.dumps(_KEPLR_ALT_SELECTORS).decode(),
+)
+
+# Resource types the APR text doesn't need - aborting them lets pages settle sooner
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media', 'stylesheet'})
+
+
+async def _block_heavy_resources(route):
+    """Playwright route handler that drops images, fonts, media and CSS"""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 class APRScraper:
     """APR scraper for Cosmos ecosystem tokens - Keplr only with robust caching"""
 
+    # One Playwright driver and Chromium process shared by every instance;
+    # each instance opens its own context on it (guarded by _browser_lock)
+    _shared_playwright = None
+    _shared_browser = None
+    _shared_users = 0
+    _browser_lock = asyncio.Lock()
+
     def __init__(self, cache_dir: str = "data/cache"):
         self.session = None
-        self.browser = None
-        self.context = None
-        self.playwright = None
+        self.browser = None  # shared browser, set while this instance holds it
 
         # Multi-tier caching
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.cache_file = self.cache_dir / "apr_cache.json"
 
-        self.memory_cache = {}  # In-memory cache
-        self.cache_timestamps = {}
-        self.fresh_duration = 600  # 10 minutes = fresh (matches background update interval)
-        self.stale_duration = 3600  # 1 hour = stale but usable
+        scraping_settings = config.get_settings().get('scraping', {})
+
+        # token -> (apr, cached_at, fresh_until); one lookup per cache check
+        self.memory_cache: Dict[str, Tuple[float, float, float]] = {}
+        # fresh: served without scraping (matches background update interval)
+        # stale: still served, but refreshed in the background
+        self.fresh_duration = scraping_settings.get('fresh_cache_seconds', 600)
+        self.stale_duration = scraping_settings.get('stale_cache_seconds', 86400)
 
-        # Load config fallbacks
-        self.config_fallbacks = {}
-        for symbol in config.get_enabled_tokens():
-            token_config = config.get_token_config(symbol)
-            if token_config:
-                self.config_fallbacks[symbol] = token_config.get('fallback_apr', 10.0)
+        # Disk writes are coalesced: _set_cache marks the cache dirty and the
+        # flush happens once writes have been quiet for flush_delay seconds
+        self.flush_delay = 0.5
+        self._dirty = False
+        self._flush_handle = None
+
+        # Keplr URLs are fixed for the lifetime of this scraper, look them up once
+        self._keplr_urls = config.get_keplr_urls()
 
         # Browser config
-        self.browser_timeout = 30000  # 30 seconds
-        self.max_retries = 3
-        self._browser_lock = asyncio.Lock()
+        self.browser_timeout = scraping_settings.get('browser_timeout_ms', 30000)
+        self.max_retries = scraping_settings.get('max_retries', 3)
+        self.max_concurrent_pages = scraping_settings.get('concurrent_limit', 8)
+
+        # Browser is kept alive between batches and recycled when too old/used
+        self.browser_max_age = 1800  # 30 minutes
+        self.browser_max_pages = 100
+        self._browser_started_at = None
+        self._pages_served = 0
+
+        # Stale-while-revalidate background refresh
+        self._refresh_task = None
+        self._closed = False
 
         # Load cached data on init
         self._load_cache_from_disk()
@@ -63,81 +131,111 @@ class APRScraper:
             return
 
         try:
-            with open(self.cache_file, 'r') as f:
-                data = json.load(f)
-                self.memory_cache = data.get('cache', {})
-                self.cache_timestamps = data.get('timestamps', {})
+            data = orjson.loads(self.cache_file.read_bytes())
+            timestamps = data.get('timestamps', {})
+            self.memory_cache = {
+                token: (apr, timestamps[token], timestamps[token] + self.fresh_duration)
+                for token, apr in data.get('cache', {}).items()
+                if token in timestamps
+            }
             logger.info(f"Loaded {len(self.memory_cache)} cached APRs from disk")
         except Exception as e:
             logger.error(f"Error loading cache from disk: {e}")
 
     def _save_cache_to_disk(self):
-        """Save cache to disk"""
+        """Save cache to disk (atomic write)"""
+        temp_file = self.cache_file.with_suffix('.tmp')
         try:
+            entries = self.memory_cache.items()
             data = {
-                'cache': self.memory_cache,
-                'timestamps': self.cache_timestamps,
-                'last_updated': time.time()
+                'cache': {token: entry[0] for token, entry in entries},
+                'timestamps': {token: entry[1] for token, entry in entries}
             }
-            with open(self.cache_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            temp_file.write_bytes(orjson.dumps(data))
+            os.replace(temp_file, self.cache_file)
         except Exception as e:
+            if temp_file.exists():
+                temp_file.unlink()
             logger.error(f"Error saving cache to disk: {e}")
 
-    def _is_cache_fresh(self, token: str) -> bool:
-        """Check if cached APR is fresh (< 1 hour)"""
-        if token not in self.memory_cache or token not in self.cache_timestamps:
-            return False
-        age = time.time() - self.cache_timestamps[token]
-        return age < self.fresh_duration
-
-    def _is_cache_stale(self, token: str) -> bool:
-        """Check if cached APR is stale but usable (< 24 hours)"""
-        if token not in self.memory_cache or token not in self.cache_timestamps:
-            return False
-        age = time.time() - self.cache_timestamps[token]
-        return age < self.stale_duration
-
-    def _get_cache_age(self, token: str) -> Optional[float]:
-        """Get age of cached value in hours"""
-        if token not in self.cache_timestamps:
-            return None
-        age_seconds = time.time() - self.cache_timestamps[token]
-        return age_seconds / 3600
+    def _schedule_flush(self):
+        """Mark cache dirty and (re)arm the debounced disk flush"""
+        self._dirty = True
+        if self._flush_handle:
+            self._flush_handle.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (sync caller) - write immediately
+            self._flush_cache()
+            return
+        self._flush_handle = loop.call_later(self.flush_delay, self._flush_cache)
+
+    def _flush_cache(self):
+        """Write pending cache changes to disk, if any"""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._dirty:
+            self._dirty = False
+            self._save_cache_to_disk()
+
+    def _classify(self, token: str, now: float) -> Tuple[str, Optional[float], Optional[float]]:
+        """
+        Classify a cached APR in one pass
+        Returns (state, value, age_seconds) where state is 'fresh', 'stale', 'expired' or 'miss'
+        """
+        entry = self.memory_cache.get(token)
+        if entry is None:
+            return ('miss', None, None)
+
+        value, ts, fresh_until = entry
+        age = now - ts
+        if now < fresh_until:
+            return ('fresh', value, age)
+        if age < self.stale_duration:
+            return ('stale', value, age)
+        return ('expired', value, age)
 
     def _set_cache(self, token: str, apr: float):
-        """Cache APR value in memory and disk"""
-        self.memory_cache[token] = apr
-        self.cache_timestamps[token] = time.time()
-        self._save_cache_to_disk()
+        """Cache APR value in memory and schedule a disk flush"""
+        now = time.time()
+        # Fresh TTL gets +/-10% jitter so tokens cached in the same batch
+        # don't all go stale (and get refreshed) at the same moment
+        self.memory_cache[token] = (apr, now, now + self.fresh_duration * random.uniform(0.9, 1.1))
+        self._schedule_flush()
         logger.info(f"{token}: Cached {apr}% APR")
 
-    def _get_cached_or_fallback(self, token: str) -> float:
+    def _skips_scraping(self, token: str) -> bool:
+        """Check if a token is configured with skip_apr_scraping"""
+        token_config = config.get_token_config(token)
+        return bool(token_config and token_config.get('skip_apr_scraping', False))
+
+    def _get_cached_or_fallback(self, token: str, now: Optional[float] = None) -> float:
         """
         Get APR with fallback
         Priority: fresh cache > stale cache > config fallback (if skip_apr_scraping) > 0
         """
+        if now is None:
+            now = time.time()
+        state, value, age = self._classify(token, now)
+
         # Try fresh cache
-        if self._is_cache_fresh(token):
-            age = self._get_cache_age(token)
-            logger.info(f"{token}: Using fresh cache ({age:.1f}h old)")
-            return self.memory_cache[token]
+        if state == 'fresh':
+            logger.info(f"{token}: Using fresh cache ({age / 3600:.1f}h old)")
+            return value
 
         # Try stale cache
-        if self._is_cache_stale(token):
-            age = self._get_cache_age(token)
-            logger.warning(f"{token}: Using stale cache ({age:.1f}h old)")
-            return self.memory_cache[token]
+        if state == 'stale':
+            logger.warning(f"{token}: Using stale cache ({age / 3600:.1f}h old)")
+            return value
 
         # No cache available - check if this is a skip_apr_scraping token
-        token_config = config.get_token_config(token.upper())
-        if token_config and token_config.get('skip_apr_scraping', False):
-            fallback_apr = token_config.get('fallback_apr', 0.0)
+        if self._skips_scraping(token):
+            fallback_apr = config.get_token_config(token).get('fallback_apr', 0.0)
             logger.info(f"{token}: Using config fallback APR: {fallback_apr}%")
             # Cache this value so it's available next time
-            self.memory_cache[token] = fallback_apr
-            self.cache_timestamps[token] = time.time()
-            self._save_cache_to_disk()
+            self._set_cache(token, fallback_apr)
             return fallback_apr
 
         # Failed - return 0
@@ -147,6 +245,7 @@ class APRScraper:
     async def __aenter__(self):
         """Async context manager entry"""
         self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
             timeout=aiohttp.ClientTimeout(total=30),
             headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
         )
@@ -154,223 +253,362 @@ class APRScraper:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit with proper cleanup"""
-        await self.cleanup_browser()
+        self._closed = True
+        self._flush_cache()
+        # A running background refresh still needs the browser; it cleans up when done
+        if not self._refresh_task or self._refresh_task.done():
+            await self.cleanup_browser()
         if self.session:
             await self.session.close()
 
     async def cleanup_browser(self):
         """Clean up browser resources safely"""
-        try:
-            if self.context:
-                await self.context.close()
-                self.context = None
-            if self.browser:
-                await self.browser.close()
-                self.browser = None
-            if self.playwright:
-                await self.playwright.stop()
-                self.playwright = None
-        except Exception as e:
-            logger.error(f"Error during browser cleanup: {e}")
+        async with self._browser_lock:
+            await self._release_browser()
+
+    async def _release_browser(self):
+        """
+        Drop this instance's hold on the shared browser
+        The browser process itself is closed once no instance is using it.
+        Caller must hold _browser_lock.
+        """
+        cls = APRScraper
+        if self.browser:
+            self.browser = None
+            cls._shared_users -= 1
+            if cls._shared_users == 0:
+                try:
+                    if cls._shared_browser:
+                        await cls._shared_browser.close()
+                    if cls._shared_playwright:
+                        await cls._shared_playwright.stop()
+                except Exception as e:
+                    logger.error(f"Error during browser cleanup: {e}")
+                cls._shared_browser = None
+                cls._shared_playwright = None
+
+        self._browser_started_at = None
+        self._pages_served = 0
+
+    async def recycle_browser_if_needed(self):
+        """Restart the browser if it has been alive too long or served too many pages"""
+        async with self._browser_lock:
+            if not self.browser:
+                return
+
+            age = time.time() - self._browser_started_at
+            if age > self.browser_max_age or self._pages_served > self.browser_max_pages:
+                logger.info(f"Recycling browser ({age / 60:.0f} min old, {self._pages_served} pages served)")
+                await self._release_browser()
 
     async def init_browser(self):
         """Initialize browser for web scraping with proper error handling"""
+        if self.browser and self.browser.is_connected():
+            # Fast path: browser already up, no need to contend for the lock
+            return
+
+        cls = APRScraper
         async with self._browser_lock:
-            if not self.browser:
+            if not self.browser or not self.browser.is_connected():
                 try:
-                    self.playwright = await async_playwright().start()
-                    self.browser = await self.playwright.chromium.launch(
-                        headless=True,
-                        args=[
-                            '--no-sandbox',
-                            '--disable-dev-shm-usage',
-                            '--disable-gpu',
-                            '--disable-web-security',
-                            '--disable-features=VizDisplayCompositor'
-                        ]
-                    )
-                    self.context = await self.browser.new_context(
-                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                        viewport={'width': 1280, 'height': 720},
-                        ignore_https_errors=True
-                    )
+                    # Launch the shared browser on first use (or if it died)
+                    if cls._shared_browser is None or not cls._shared_browser.is_connected():
+                        if cls._shared_playwright is None:
+                            cls._shared_playwright = await async_playwright().start()
+                        cls._shared_browser = await cls._shared_playwright.chromium.launch(
+                            headless=True,
+                            args=[
+                                '--no-sandbox',
+                                '--disable-dev-shm-usage',
+                                '--disable-gpu',
+                                '--disable-web-security',
+                                '--disable-features=VizDisplayCompositor'
+                            ]
+                        )
+                        logger.info("Browser launched")
+
+                    if not self.browser:
+                        cls._shared_users += 1
+                    self.browser = cls._shared_browser
 
-                    # Set default timeouts
-                    self.context.set_default_timeout(self.browser_timeout)
-                    self.context.set_default_navigation_timeout(self.browser_timeout)
+                    self._browser_started_at = time.time()
+                    self._pages_served = 0
 
                     logger.info("Browser initialized successfully")
                 except Exception as e:
                     logger.error(f"Failed to initialize browser: {e}")
-                    await self.cleanup_browser()
+                    await self._release_browser()
                     raise
 
+    async def _new_context(self):
+        """Open an isolated browser context so concurrent scrapes don't share tabs/state"""
+        context = await self.browser.new_context(
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            viewport={'width': 1280, 'height': 720},
+            ignore_https_errors=True
+        )
+
+        # Set default timeouts
+        context.set_default_timeout(self.browser_timeout)
+        context.set_default_navigation_timeout(self.browser_timeout)
+        await context.route("**/*", _block_heavy_resources)
+        return context
+
+    async def _get_json(self, url: str) -> Dict:
+        """GET a JSON document over the shared aiohttp session"""
+        async with self.session.get(url) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def fetch_apr_lcd(self, token_symbol: str) -> Optional[float]:
+        """
+        Compute APR from chain LCD data - returns None if fails
+        APR = inflation * (1 - community_tax) * total_supply / bonded_tokens
+        Only used for tokens with an 'lcd_endpoints' section in config.json
+        """
+        token_config = config.get_token_config(token_symbol) or {}
+        lcd = token_config.get('lcd_endpoints')
+        if not lcd or not self.session:
+            return None
+
+        try:
+            inflation_data, pool_data, supply_data = await asyncio.gather(
+                self._get_json(lcd['inflation_url']),
+                self._get_json(lcd['pool_url']),
+                self._get_json(lcd['supply_url'])
+            )
+
+            inflation = float(inflation_data['inflation'])
+            bonded_tokens = float(pool_data['pool']['bonded_tokens'])
+            total_supply = float(supply_data['amount']['amount'])
+            community_tax = float(lcd.get('community_tax', 0.0))
+
+            if bonded_tokens <= 0:
+                logger.warning(f"{token_symbol}: LCD reports no bonded tokens")
+                return None
+
+            apr_value = round(inflation * (1 - community_tax) * total_supply / bonded_tokens * 100, 2)
+            self._set_cache(token_symbol, apr_value)
+            logger.info(f"{token_symbol}: Computed {apr_value}% from LCD")
+            return apr_value
+
+        except Exception as e:
+            logger.warning(f"{token_symbol}: LCD APR fetch failed: {e}")
+            return None
+
+    @staticmethod
+    async def _backoff(attempt: int):
+        """Short jittered exponential backoff before retrying a transient failure"""
+        await asyncio.sleep(0.1 * 2 ** attempt * random.uniform(0.5, 1.5))
+
     async def scrape_keplr_apr(self, token_symbol: str) -> Optional[float]:
         """Scrape APR from Keplr wallet - returns None if fails"""
         for attempt in range(self.max_retries):
-            page = None
+            context = None
             try:
                 await self.init_browser()
 
-                keplr_urls = config.get_keplr_urls()
-                url = keplr_urls.get(token_symbol)
+                url = self._keplr_urls.get(token_symbol)
 
                 if not url:
                     logger.warning(f"{token_symbol}: No Keplr URL configured")
                     return None
 
-                page = await self.context.new_page()
-                page.set_default_timeout(self.browser_timeout)
-                page.set_default_navigation_timeout(self.browser_timeout)
+                context = await self._new_context()
+                page = await context.new_page()
+                self._pages_served += 1
 
                 try:
-                    await page.goto(url, wait_until='networkidle', timeout=self.browser_timeout)
-                    await page.wait_for_timeout(3000)
+                    await page.goto(url, wait_until='domcontentloaded', timeout=self.browser_timeout)
                 except Exception as nav_error:
                     logger.warning(f"{token_symbol}: Navigation failed (attempt {attempt + 1}): {nav_error}")
                     if attempt < self.max_retries - 1:
+                        await self._backoff(attempt)
                         continue
                     return None
 
-                # Primary XPath selector
-                apr_selector = "//*[@id='__next']/div[2]/div[2]/div/div[1]/div/div[2]/div/div/div/div[1]/div[2]/p"
-                apr_locator = page.locator(f"xpath={apr_selector}")
-
-                if await apr_locator.count() > 0:
-                    apr_text = await apr_locator.first.inner_text()
-                    if apr_text:
-                        apr_match = re.search(r'(\d+\.?\d*)%', apr_text)
-                        if apr_match:
-                            apr_value = float(apr_match.group(1))
-                            self._set_cache(token_symbol, apr_value)
-                            logger.info(f"{token_symbol}: Scraped {apr_value}% from Keplr")
-                            return apr_value
-
-                # Try alternative selectors
-                for selector in ["text=% APR", "[data-testid*='apr']", ".apr-value", ".staking-apr"]:
-                    try:
-                        elements = await page.locator(selector).all()
-                        for element in elements:
-                            text = await element.inner_text()
-                            if text and '%' in text:
-                                apr_match = re.search(r'(\d+\.?\d*)%', text)
-                                if apr_match:
-                                    apr_value = float(apr_match.group(1))
-                                    if 0 < apr_value < 100:
-                                        self._set_cache(token_symbol, apr_value)
-                                        logger.info(f"{token_symbol}: Scraped {apr_value}% from Keplr (alt selector)")
-                                        return apr_value
-                    except Exception:
-                        continue
-
+                # Poll the extractor until the APR renders instead of sleeping
+                try:
+                    apr_handle = await page.wait_for_function(_EXTRACT_APR_JS, polling=250, timeout=10000)
+                    apr_value = await apr_handle.json_value()
+                except PlaywrightTimeoutError:
+                    apr_value = None
+
+                if apr_value is not None:
+                    self._set_cache(token_symbol, apr_value)
+                    logger.info(f"{token_symbol}: Scraped {apr_value}% from Keplr")
+                    return apr_value
+
+                # Page loaded but the APR never rendered - waiting longer
+                # before the next attempt won't help, so retry straight away
                 logger.warning(f"{token_symbol}: Could not find APR (attempt {attempt + 1})")
 
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
                     continue
                 return None
 
             except Exception as e:
                 logger.error(f"{token_symbol}: Scraping error (attempt {attempt + 1}): {e}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await self._backoff(attempt)
                     continue
                 return None
             finally:
-                if page:
+                if context:
                     try:
-                        await page.close()
+                        await context.close()
                     except Exception:
                         pass
 
         logger.error(f"{token_symbol}: Failed to scrape after {self.max_retries} attempts")
         return None
 
-    async def get_multiple_aprs(self, tokens: List[str]) -> Dict[str, float]:
+    async def _scrape_tokens(self, tokens: List[str]) -> List[Tuple[str, Optional[float]]]:
+        """
+        Scrape a batch of tokens, up to max_concurrent_pages tabs at once
+        Caller must hold _global_scraping_lock and flush the cache afterwards.
+        Returns (token, apr or None) pairs.
+        """
+        logger.info(f"Scraping {len(tokens)} tokens ({self.max_concurrent_pages} at a time): {', '.join(tokens)}")
+
+        # Reuse the browser from the previous batch unless it is due for a restart
+        await self.recycle_browser_if_needed()
+
+        # Each scrape gets its own context, so tabs no longer contend and the
+        # limit only bounds browser load
+        semaphore = asyncio.Semaphore(max(1, min(len(tokens), self.max_concurrent_pages)))
+
+        async def scrape_one(token: str):
+            token_config = config.get_token_config(token)
+
+            # Tokens with LCD endpoints don't need a browser at all
+            if token_config and token_config.get('lcd_endpoints'):
+                apr = await self.fetch_apr_lcd(token)
+                if apr is not None:
+                    return (token, apr)
+                logger.info(f"{token}: Falling back to Keplr scraping")
+
+            async with semaphore:
+                # Scrape with timeout per token (30s max)
+                try:
+                    apr = await asyncio.wait_for(
+                        self.scrape_keplr_apr(token),
+                        timeout=30.0
+                    )
+                    logger.info(f"{token}: Scraped successfully - {apr}%")
+                    return (token, apr)
+                except asyncio.TimeoutError:
+                    logger.error(f"{token}: Scraping timed out after 30s")
+                    return (token, None)
+                except Exception as e:
+                    logger.error(f"{token}: Exception during scraping: {e}")
+                    return (token, None)
+
+        # scrape_one never raises (failures come back as None), so the group
+        # never cancels siblings and every finished token keeps its result
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(scrape_one(token)) for token in tokens]
+
+        return [task.result() for task in tasks]
+
+    def _start_background_refresh(self, tokens: List[str]):
+        """Re-scrape stale tokens off the caller's critical path (one refresh at a time)"""
+        if self._refresh_task and not self._refresh_task.done():
+            logger.info("Background APR refresh already running")
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh(tokens))
+
+    async def _background_refresh(self, tokens: List[str]):
+        """Background half of stale-while-revalidate"""
+        try:
+            async with _global_scraping_lock:
+                # Another scrape may have refreshed these while we waited
+                now = time.time()
+                tokens = [t for t in tokens if self._classify(t, now)[0] != 'fresh']
+                if tokens:
+                    logger.info(f"Revalidating stale APRs in background: {', '.join(tokens)}")
+                    await self._scrape_tokens(tokens)
+                    self._flush_cache()
+        except Exception as e:
+            logger.error(f"Background APR refresh failed: {e}")
+        finally:
+            # The scraper was closed while we were running - release the browser now
+            if self._closed:
+                await self.cleanup_browser()
+
+    async def get_multiple_aprs(self, tokens: List[str], allow_stale: bool = True) -> Dict[str, float]:
         """
         Get APRs for multiple tokens
         Returns cached/fallback values if scraping fails.
+        With allow_stale, stale values are returned immediately and refreshed in
+        the background; only tokens with no usable cache block on scraping.
         Uses global lock to ensure only one scraping operation at a time.
         """
         logger.info(f"Fetching APRs for {len(tokens)} tokens...")
 
         apr_dict = {}
+        now = time.time()
+
+        # First, sort tokens by cache state (same rules as _classify, inlined
+        # with local aliases since this runs once per requested token)
+        cache = self.memory_cache
+        stale_limit = self.stale_duration if allow_stale else 0
 
-        # First, check which tokens need scraping (not fresh in cache)
-        tokens_to_scrape = []
+        tokens_to_scrape = []  # no usable cache - caller waits for these
+        tokens_to_revalidate = []  # stale - served now, refreshed in background
         for token in tokens:
             token = token.upper()
-            if self._is_cache_fresh(token):
+            entry = cache.get(token)
+            if entry is not None and now < entry[2]:
                 # Use fresh cache
-                apr_dict[token] = self._get_cached_or_fallback(token)
+                apr_dict[token] = entry[0]
+            elif self._skips_scraping(token):
+                # Never scraped - needs neither the lock nor the browser
+                apr_dict[token] = self._get_cached_or_fallback(token, now)
+            elif entry is not None and now - entry[1] < stale_limit:
+                apr_dict[token] = entry[0]
+                tokens_to_revalidate.append(token)
             else:
                 # Needs scraping
                 tokens_to_scrape.append(token)
 
+        if tokens_to_revalidate:
+            self._start_background_refresh(tokens_to_revalidate)
+
         # If nothing to scrape, return cached/fallback values
         if not tokens_to_scrape:
-            logger.info("All tokens have fresh cache")
+            logger.info("All tokens have usable cache")
             return apr_dict
 
         # Use global lock to ensure only ONE scraping operation at a time
-        # If another scrape is in progress, wait for it to finish then use cache
+        # If another scrape (or a background revalidation) is in progress, wait for it
         if _global_scraping_lock.locked():
             logger.info("Another scraping operation in progress, waiting for it to finish...")
-            async with _global_scraping_lock:
-                # Scraping finished, check cache again
-                for token in tokens_to_scrape:
-                    apr_dict[token] = self._get_cached_or_fallback(token)
-                return apr_dict
 
-        # Acquire lock and scrape tokens - ONE AT A TIME (sequential)
         async with _global_scraping_lock:
-            logger.info(f"Scraping {len(tokens_to_scrape)} tokens sequentially: {', '.join(tokens_to_scrape)}")
-
-            results = []
+            # Whatever held the lock may have cached some of these - scrape only the rest
+            now = time.time()
+            still_missing = []
             for token in tokens_to_scrape:
-                try:
-                    # Skip if configured to skip scraping
-                    token_config = config.get_token_config(token)
-                    if token_config and token_config.get('skip_apr_scraping', False):
-                        logger.info(f"{token}: Skipping scraping (configured)")
-                        results.append((token, None))
-                        continue
-
-                    # Scrape with timeout per token (30s max)
-                    try:
-                        apr = await asyncio.wait_for(
-                            self.scrape_keplr_apr(token),
-                            timeout=30.0
-                        )
-                        results.append((token, apr))
-                        logger.info(f"{token}: Scraped successfully - {apr}%")
-
-                        # Small delay between scrapes to avoid overwhelming the system
-                        await asyncio.sleep(0.5)
-
-                    except asyncio.TimeoutError:
-                        logger.error(f"{token}: Scraping timed out after 30s")
-                        results.append((token, None))
-
-                except Exception as e:
-                    logger.error(f"{token}: Exception during scraping: {e}")
-                    results.append((token, None))
+                state, value, _ = self._classify(token, now)
+                if state == 'fresh' or (allow_stale and state == 'stale'):
+                    apr_dict[token] = value
+                else:
+                    still_missing.append(token)
 
-            # Process results
-            for result in results:
-                if isinstance(result, Exception):
-                    logger.error(f"Exception in scraping: {result}")
-                    continue
+            if still_missing:
+                results = await self._scrape_tokens(still_missing)
 
-                token, apr = result
-                if apr is not None:
-                    apr_dict[token] = apr
-                else:
-                    # Scraping failed, use cache or fallback
-                    apr_dict[token] = self._get_cached_or_fallback(token)
+                # Process results
+                for token, apr in results:
+                    if apr is not None:
+                        apr_dict[token] = apr
+                    else:
+                        # Scraping failed, use cache or fallback
+                        apr_dict[token] = self._get_cached_or_fallback(token)
 
-            # Clean up browser
-            await self.cleanup_browser()
+                # Persist scraped values and fallback inserts with a single write
+                self._flush_cache()
 
         # Ensure ALL tokens have a value (should already, but double-check)
         for token in tokens:
@@ -381,6 +619,35 @@ class APRScraper:
         logger.info(f"✅ Returned APRs for {len(apr_dict)}/{len(tokens)} tokens")
         return apr_dict
 
+
+# Process-wide scraper shared by all callers (see get_scraper)
+_scraper_instance: Optional[APRScraper] = None
+_scraper_lock = asyncio.Lock()
+
+
+async def get_scraper() -> APRScraper:
+    """
+    Get the shared APRScraper, creating it on first use
+    Keeps the HTTP session, browser and in-memory cache alive between calls;
+    callers must not close it - use close_scraper() on app shutdown.
+    """
+    global _scraper_instance
+    async with _scraper_lock:
+        if _scraper_instance is None:
+            scraper = APRScraper()
+            await scraper.__aenter__()
+            _scraper_instance = scraper
+        return _scraper_instance
+
+
+async def close_scraper():
+    """Close the shared APRScraper, if one was created"""
+    global _scraper_instance
+    async with _scraper_lock:
+        if _scraper_instance is not None:
+            await _scraper_instance.__aexit__(None, None, None)
+            _scraper_instance = None
+
 # Example usage and testing
 async def test_apr_scraper():
     """Test the APR scraper"""
@@ -4,8 +4,10 @@ Bech32 Address Converter
 Converts addresses between different Cosmos chains using the same public key
 """
 import logging
-from typing import List, Dict, Optional
-from bech32 import bech32_decode, bech32_encode, convertbits
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+from bech32 import convertbits
+from _bech32_fast import bech32_decode, bech32_encode
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,7 @@ class Bech32Converter:
         'nolus': 'nolus',
         # Note: Cardano uses different address format, not bech32 compatible
     }
+    _PREFIX_TO_CHAIN = {prefix: chain for chain, prefix in CHAIN_PREFIXES.items()}
 
     @staticmethod
     def decode_address(address: str) -> Optional[bytes]:
@@ -54,6 +57,32 @@ class Bech32Converter:
             logger.error(f"Error decoding address {address}: {e}")
             return None
 
+    @staticmethod
+    def _decode_to_5bit(address: str) -> Optional[List[int]]:
+        """
+        Decode a bech32 address to its 5-bit payload without converting to bytes
+
+        Re-encoding this payload under another prefix gives the same result as
+        decode_address + encode_address, minus the 5->8->5 bit round-trip.
+        Rejects the same non-zero padding that convertbits(..., False) would.
+        """
+        try:
+            hrp, data = bech32_decode(address)
+            if hrp is None or data is None:
+                logger.error(f"Failed to decode address: {address}")
+                return None
+
+            pad = (len(data) * 5) % 8
+            if pad >= 5 or (data and data[-1] & ((1 << pad) - 1)):
+                logger.error(f"Failed to convert bits for address: {address}")
+                return None
+
+            return data
+
+        except Exception as e:
+            logger.error(f"Error decoding address {address}: {e}")
+            return None
+
     @staticmethod
     def encode_address(data: bytes, prefix: str) -> Optional[str]:
         """
@@ -125,43 +154,67 @@ class Bech32Converter:
                 ...
             }
         """
-        # Decode the original address
-        data = cls.decode_address(address)
+        return dict(cls._chain_address_pairs(address))
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _chain_address_pairs(address: str) -> Tuple[Tuple[str, str], ...]:
+        """
+        Memoized body of get_all_chain_addresses
+        Returns immutable (chain_name, address) pairs so cached results can't be
+        mutated by callers; a fresh dict is built per call.
+        """
+        # Decode the original address once; only the prefix changes per chain
+        data = Bech32Converter._decode_to_5bit(address)
         if data is None:
             logger.error(f"Could not decode address: {address}")
-            return {}
+            return ()
 
         # Convert to all chain prefixes
-        all_addresses = {}
+        all_addresses = []
 
-        for chain_name, prefix in cls.CHAIN_PREFIXES.items():
-            converted = cls.encode_address(data, prefix)
+        for chain_name, prefix in Bech32Converter.CHAIN_PREFIXES.items():
+            converted = bech32_encode(prefix, data)
             if converted:
-                all_addresses[chain_name] = converted
+                all_addresses.append((chain_name, converted))
                 logger.debug(f"Converted to {chain_name}: {converted}")
             else:
                 logger.warning(f"Failed to convert address to {chain_name}")
 
-        return all_addresses
+        return tuple(all_addresses)
 
     @classmethod
-    def detect_chain(cls, address: str) -> Optional[str]:
+    def detect_chain(cls, address: str, validate: bool = False) -> Optional[str]:
         """
         Detect which chain an address belongs to
 
         Args:
             address: Bech32 address
+            validate: Also verify the bech32 checksum (full decode)
 
         Returns:
             Chain name, or None if not recognized
         """
+        if validate:
+            return cls._detect_chain(address)
+
+        # The HRP is everything before the last '1' - no decode needed
+        pos = address.rfind('1')
+        if pos < 1:
+            return None
+        return cls._PREFIX_TO_CHAIN.get(address[:pos].lower())
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _detect_chain(address: str) -> Optional[str]:
+        """Memoized body of detect_chain"""
         try:
             hrp, _ = bech32_decode(address)
             if hrp is None:
                 return None
 
             # Find matching chain
-            for chain_name, prefix in cls.CHAIN_PREFIXES.items():
+            for chain_name, prefix in Bech32Converter.CHAIN_PREFIXES.items():
                 if hrp == prefix:
                     return chain_name
 
@@ -3,7 +3,8 @@
 Central Configuration Loader
 ALL app configuration comes from this single file
 """
-import json
+import orjson
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional
 import logging
@@ -15,15 +16,20 @@ class ConfigLoader:
 
     _instance = None
     _config = None
+    _lock = threading.RLock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(ConfigLoader, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(ConfigLoader, cls).__new__(cls)
         return cls._instance
 
     def __init__(self):
         if self._config is None:
-            self.load_config()
+            with self._lock:
+                if self._config is None:
+                    self.load_config()
 
     def load_config(self, config_path: Optional[str] = None):
         """Load configuration from config.json"""
@@ -35,27 +41,47 @@ class ConfigLoader:
             config_path = Path(config_path)
 
         try:
-            with open(config_path, 'r') as f:
-                self._config = json.load(f)
+            data = orjson.loads(config_path.read_bytes())
+            with self._lock:
+                self._config = data
+                self._build_views()
             logger.info(f"Configuration loaded from {config_path}")
         except FileNotFoundError:
             logger.error(f"Configuration file not found: {config_path}")
             raise
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON in configuration file: {e}")
             raise
 
+    def _build_views(self):
+        """
+        Precompute the derived views served by the getters below
+        The config only changes on reload(), so these are built once per load.
+        Getters return the shared objects - callers must not mutate them.
+        """
+        tokens = self._config.get('tokens', {}) if self._config else {}
+
+        self._enabled_tokens = [
+            symbol for symbol, token in tokens.items()
+            if token.get('enabled', False)
+        ]
+
+        self._network_configs = {}
+        self._apr_configs = {}
+        self._keplr_urls = {}
+        self._token_denoms = {}
+        for symbol in self._enabled_tokens:
+            token = tokens[symbol]
+            self._network_configs[token.get('chain_name')] = self._network_config(token)
+            self._apr_configs[symbol] = self._apr_config(token)
+            if 'keplr_url' in token:
+                self._keplr_urls[symbol] = token['keplr_url']
+            if 'ibc_denom' in token:
+                self._token_denoms[symbol] = token['ibc_denom']
+
     def get_enabled_tokens(self) -> List[str]:
         """Get list of enabled token symbols"""
-        if not self._config:
-            return []
-
-        enabled = []
-        for symbol, config in self._config.get('tokens', {}).items():
-            if config.get('enabled', False):
-                enabled.append(symbol)
-
-        return enabled
+        return self._enabled_tokens
 
     def get_token_config(self, symbol: str) -> Optional[Dict]:
         """Get configuration for a specific token"""
@@ -91,27 +117,22 @@ class ConfigLoader:
         if not token:
             return {}
 
+        return self._network_config(token)
+
+    @staticmethod
+    def _network_config(token: Dict) -> Dict:
+        """Build the wallet analyzer view of a token config"""
         return {
             'rest_endpoints': token.get('rest_endpoints', []),
             'token_symbol': token.get('symbol'),
             'token_decimals': token.get('decimals', 6),
-            'bech32_prefix': token.get('bech32_prefix')
+            'bech32_prefix': token.get('bech32_prefix'),
+            'native_denom': token.get('native_denom')
         }
 
     def get_all_network_configs(self) -> Dict[str, Dict]:
         """Get all network configs for wallet analyzer"""
-        configs = {}
-        for symbol in self.get_enabled_tokens():
-            token = self.get_token_config(symbol)
-            if token:
-                chain_name = token.get('chain_name')
-                configs[chain_name] = {
-                    'rest_endpoints': token.get('rest_endpoints', []),
-                    'token_symbol': token.get('symbol'),
-                    'token_decimals': token.get('decimals', 6),
-                    'bech32_prefix': token.get('bech32_prefix')
-                }
-        return configs
+        return self._network_configs
 
     def get_apr_config(self, symbol: str) -> Dict:
         """Get APR configuration for a token"""
@@ -119,6 +140,11 @@ class ConfigLoader:
         if not token:
             return {}
 
+        return self._apr_config(token)
+
+    @staticmethod
+    def _apr_config(token: Dict) -> Dict:
+        """Build the APR view of a token config"""
         return {
             'fallback_apr': token.get('fallback_apr', 10.0),
             'source': 'scraper',
@@ -128,28 +154,15 @@ class ConfigLoader:
 
     def get_all_apr_configs(self) -> Dict[str, Dict]:
         """Get all APR configs"""
-        aprs = {}
-        for symbol in self.get_enabled_tokens():
-            aprs[symbol] = self.get_apr_config(symbol)
-        return aprs
+        return self._apr_configs
 
     def get_keplr_urls(self) -> Dict[str, str]:
         """Get Keplr URLs for APR scraping"""
-        urls = {}
-        for symbol in self.get_enabled_tokens():
-            token = self.get_token_config(symbol)
-            if token and 'keplr_url' in token:
-                urls[symbol] = token['keplr_url']
-        return urls
+        return self._keplr_urls
 
     def get_token_denoms(self) -> Dict[str, str]:
         """Get IBC denoms for price fetching"""
-        denoms = {}
-        for symbol in self.get_enabled_tokens():
-            token = self.get_token_config(symbol)
-            if token and 'ibc_denom' in token:
-                denoms[symbol] = token['ibc_denom']
-        return denoms
+        return self._token_denoms
 
     def get_settings(self) -> Dict:
         """Get global settings"""
@@ -172,8 +185,8 @@ class ConfigLoader:
 
     def reload(self):
         """Reload configuration from disk"""
-        self._config = None
-        self.load_config()
+        with self._lock:
+            self.load_config()
 
 
 # Global config instance
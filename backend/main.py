@@ -5,16 +5,22 @@ FastAPI server for portfolio tracking
 """
 import asyncio
 import logging
+import os
 import re
+import time
+from contextlib import aclosing, asynccontextmanager
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse
-from pydantic import BaseModel, validator
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, field_validator
 from typing import List, Optional, Dict
+from collections import OrderedDict
 from pathlib import Path
-import json
+import orjson
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from functools import lru_cache
 import hashlib
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -22,7 +28,7 @@ from slowapi.errors import RateLimitExceeded
 
 # Import our modules
 from wallet_analyzer import WalletAddressAnalyzer, WalletAnalysis
-from price_scraper import PriceAPRScraper
+from price_scraper import PriceAPRScraper, TokenData
 from bech32_converter import Bech32Converter
 from config_loader import config
 
@@ -34,17 +40,23 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Initialize rate limiter
+# Counters live in-process unless RATE_LIMIT_REDIS points at a shared store
+# (e.g. redis://localhost:6379/0), which is needed to limit across workers.
+# Stays on the default fixed-window strategy: moving-window hits cost O(limit)
+# on the Redis side.
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["100/hour"],  # Global default
-    storage_uri="memory://"
+    storage_uri=os.environ.get("RATE_LIMIT_REDIS", "memory://")
 )
 
 # Initialize FastAPI
 app = FastAPI(
     title="PassivMOS Webapp",
     description="Portfolio tracking for Cosmos ecosystem wallets",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson instead of stdlib json for every JSON response
+    default_response_class=ORJSONResponse
 )
 
 # Add rate limiter to app state
@@ -71,32 +83,51 @@ SESSIONS_DIR.mkdir(exist_ok=True)
 # Global scraper instance
 price_scraper = PriceAPRScraper(cache_dir=str(Path(__file__).parent.parent / "data" / "cache"))
 
+# Latest price/APR data, kept in memory so requests don't re-read the cache file
+latest_prices: Optional[Dict[str, TokenData]] = None
+
+def get_latest_prices() -> Optional[Dict[str, TokenData]]:
+    """Get the latest price/APR data, loading the disk cache on first use"""
+    global latest_prices
+    if latest_prices is None:
+        latest_prices = price_scraper.load_cache()
+    return latest_prices
+
+async def refresh_prices() -> Dict[str, TokenData]:
+    """
+    Fetch fresh price/APR data and make it the latest
+    Concurrent callers share one scrape - see PriceAPRScraper.scrape_all.
+    """
+    global latest_prices
+    latest_prices = await price_scraper.scrape_all()
+    return latest_prices
+
 # Constants
 MAX_ADDRESSES_PER_USER = 50
-VALID_ADDRESS_PREFIXES = ['cosmos', 'osmo', 'celestia', 'juno', 'chihuahua', 'dym', 'saga', 'nolus']
+SESSION_CACHE_SIZE = 1000  # Parsed sessions kept in memory (least recently used evicted)
+PRICE_COLLECTION_INTERVAL = 600  # Seconds between background price/APR runs
+PRICE_RETRY_MIN_DELAY = 30  # First retry delay after a failed run (doubles each time)
+VALID_ADDRESS_PREFIXES = ('cosmos', 'osmo', 'celestia', 'juno', 'chihuahua', 'dym', 'saga', 'nolus')
+
+# Precompiled validation patterns
+_USER_CODE_RE = re.compile(r'[a-zA-Z0-9_]{3,50}')
+_ADDRESS_CHARS_RE = re.compile(r'[a-z0-9]+')
 
 # Input Validation Helpers
 def validate_user_code(code: str) -> bool:
     """Validate user code format"""
-    if not code or len(code) < 3 or len(code) > 50:
-        return False
-    # Only alphanumeric and underscores
-    if not re.match(r'^[a-zA-Z0-9_]+$', code):
-        return False
-    return True
+    # 3-50 characters, only alphanumeric and underscores
+    return bool(code) and _USER_CODE_RE.fullmatch(code) is not None
 
 def validate_wallet_address(address: str) -> bool:
     """Validate wallet address format"""
     if not address or len(address) < 39 or len(address) > 90:
         return False
-    # Only lowercase alphanumeric (bech32)
-    if not re.match(r'^[a-z0-9]+$', address):
-        return False
     # Check if starts with valid prefix
-    has_valid_prefix = any(address.startswith(prefix) for prefix in VALID_ADDRESS_PREFIXES)
-    if not has_valid_prefix:
+    if not address.startswith(VALID_ADDRESS_PREFIXES):
         return False
-    return True
+    # Only lowercase alphanumeric (bech32)
+    return _ADDRESS_CHARS_RE.fullmatch(address) is not None
 
 def sanitize_addresses(addresses: List[str]) -> tuple[List[str], List[str]]:
     """
@@ -129,8 +160,9 @@ class RegisterRequest(BaseModel):
     """User registration request"""
     code: str
 
-    @validator('code')
-    def validate_code(cls, v):
+    @field_validator('code')
+    @classmethod
+    def validate_code(cls, v: str) -> str:
         if not validate_user_code(v):
             raise ValueError('Invalid code format. Use 3-50 alphanumeric characters or underscores.')
         return v
@@ -140,14 +172,16 @@ class SaveAddressesRequest(BaseModel):
     code: str
     addresses: List[str]
 
-    @validator('code')
-    def validate_code(cls, v):
+    @field_validator('code')
+    @classmethod
+    def validate_code(cls, v: str) -> str:
         if not validate_user_code(v):
             raise ValueError('Invalid code format.')
         return v
 
-    @validator('addresses')
-    def validate_addresses_count(cls, v):
+    @field_validator('addresses')
+    @classmethod
+    def validate_addresses_count(cls, v: List[str]) -> List[str]:
         if len(v) > MAX_ADDRESSES_PER_USER:
             raise ValueError(f'Maximum {MAX_ADDRESSES_PER_USER} addresses allowed.')
         return v
@@ -156,8 +190,9 @@ class CalculateRequest(BaseModel):
     """Calculate portfolio request"""
     code: str
 
-    @validator('code')
-    def validate_code(cls, v):
+    @field_validator('code')
+    @classmethod
+    def validate_code(cls, v: str) -> str:
         if not validate_user_code(v):
             raise ValueError('Invalid code format.')
         return v
@@ -173,39 +208,160 @@ class PortfolioResponse(BaseModel):
     token_breakdown: Dict[str, Dict]
     last_updated: str
 
+@dataclass(slots=True)
+class WalletRow:
+    """A balance found on one chain, with its value and projected earnings"""
+    address: str
+    original_address: str
+    chain: str
+    token_symbol: str
+    available_balance: float
+    delegated_balance: float
+    total_balance: float
+    token_price: float
+    apr: float
+    apr_status: str
+    apr_source: str
+    has_apr_issue: bool
+    total_value_usd: float
+    daily_earnings: float
+    monthly_earnings: float
+    yearly_earnings: float
+
+@lru_cache(maxsize=4096)
 def get_session_file(code: str) -> Path:
     """Get session file path for a user code"""
+    code_hash = hashlib.blake2b(code.encode(), digest_size=8).hexdigest()
+    return SESSIONS_DIR / f"{code_hash}.json"
+
+def _legacy_session_file(code: str) -> Path:
+    """Session file path used before the switch to BLAKE2b names"""
     code_hash = hashlib.sha256(code.encode()).hexdigest()[:16]
     return SESSIONS_DIR / f"{code_hash}.json"
 
-def load_session(code: str) -> Optional[UserSession]:
-    """Load user session from file"""
-    session_file = get_session_file(code)
+# Parsed session data by session file name, least recently used first - sessions
+# are only written through save_session, so this stays in sync with disk without re-reading it
+_session_cache: OrderedDict[str, dict] = OrderedDict()
+
+# In-flight background session writes by session file name
+_pending_session_writes: Dict[str, asyncio.Task] = {}
+
+# Write locks by session file name: [lock, holders and waiters], dropped when unused
+_session_locks: Dict[str, list] = {}
+
+@asynccontextmanager
+async def _session_write_lock(name: str):
+    """Serialize writes to one session file, in the order they were requested"""
+    entry = _session_locks.get(name)
+    if entry is None:
+        entry = _session_locks[name] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _session_locks[name]
+
+def _cache_session(name: str, data: dict):
+    """Keep a session's parsed data in memory, evicting the least recently used when full"""
+    _session_cache[name] = data
+    _session_cache.move_to_end(name)
+    if len(_session_cache) > SESSION_CACHE_SIZE:
+        _session_cache.popitem(last=False)
+
+def _read_session_file(session_file: Path, legacy_file: Path) -> Optional[dict]:
+    """Read and parse a session file (blocking - run in a thread)"""
     if not session_file.exists():
-        return None
+        if not legacy_file.exists():
+            return None
+        # Migrate sessions saved under the old naming scheme on first access
+        legacy_file.replace(session_file)
+    return orjson.loads(session_file.read_bytes())
+
+def _write_session_file(session_file: Path, data: dict):
+    """Write a session file atomically (blocking - run in a thread)"""
+    temp_file = session_file.with_suffix('.tmp')
+    try:
+        temp_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        temp_file.rename(session_file)
+    except Exception:
+        if temp_file.exists():
+            temp_file.unlink()
+        raise
+
+async def load_session(code: str) -> Optional[UserSession]:
+    """Load user session from memory, falling back to its file"""
+    session_file = get_session_file(code)
+    data = _session_cache.get(session_file.name)
+
+    if data is not None:
+        _session_cache.move_to_end(session_file.name)
+    else:
+        # Evicted before its background write landed - let the write finish first
+        pending = _pending_session_writes.get(session_file.name)
+        if pending:
+            await pending
+        try:
+            data = await asyncio.to_thread(_read_session_file, session_file, _legacy_session_file(code))
+        except Exception as e:
+            logger.error(f"Error loading session: {e}")
+            return None
+        if data is None:
+            return None
+        _cache_session(session_file.name, data)
 
     try:
-        with open(session_file, 'r') as f:
-            data = json.load(f)
+        # Fresh model per call so callers can mutate it freely
         return UserSession(**data)
     except Exception as e:
         logger.error(f"Error loading session: {e}")
         return None
 
-def save_session(session: UserSession):
-    """Save user session to file (atomic write)"""
+async def save_session(session: UserSession):
+    """Save user session to file (atomic write) and update the in-memory copy"""
     session_file = get_session_file(session.code)
-    temp_file = session_file.with_suffix('.tmp')
-    try:
-        with open(temp_file, 'w') as f:
-            json.dump(session.dict(), f, indent=2)
-        temp_file.rename(session_file)
-        logger.info(f"Session saved for code: {session.code}")
-    except Exception as e:
-        if temp_file.exists():
-            temp_file.unlink()
-        logger.error(f"Error saving session: {e}")
-        raise HTTPException(status_code=500, detail="Failed to save session")
+    data = session.model_dump()
+
+    # Held across the write and the cache update, so concurrent saves (including
+    # background ones) land one after another and the last one wins on disk and in memory
+    async with _session_write_lock(session_file.name):
+        try:
+            await asyncio.to_thread(_write_session_file, session_file, data)
+            _cache_session(session_file.name, data)
+            logger.info(f"Session saved for code: {session.code}")
+        except Exception as e:
+            logger.error(f"Error saving session: {e}")
+            raise HTTPException(status_code=500, detail="Failed to save session")
+
+def save_session_in_background(session: UserSession):
+    """
+    Make a session visible immediately and write it to disk off the request path
+    Loads are served from the in-memory copy until (and after) the write lands.
+    """
+    session_file = get_session_file(session.code)
+    data = session.model_dump()
+    _cache_session(session_file.name, data)
+
+    async def write():
+        async with _session_write_lock(session_file.name):
+            try:
+                await asyncio.to_thread(_write_session_file, session_file, data)
+                # A save that finished while this one waited may have replaced the cached copy
+                _cache_session(session_file.name, data)
+                logger.info(f"Session saved for code: {session.code}")
+            except Exception as e:
+                logger.error(f"Error saving session: {e}")
+
+    task = asyncio.create_task(write())
+    _pending_session_writes[session_file.name] = task
+
+    def forget(done: asyncio.Task):
+        if _pending_session_writes.get(session_file.name) is done:
+            del _pending_session_writes[session_file.name]
+
+    task.add_done_callback(forget)
 
 @app.get("/")
 async def root():
@@ -219,7 +375,7 @@ async def register(req: RegisterRequest, request: Request):
     request_data = req  # Rename for clarity
 
     # Check if session exists
-    existing_session = load_session(request_data.code)
+    existing_session = await load_session(request_data.code)
 
     if existing_session:
         return {
@@ -236,7 +392,7 @@ async def register(req: RegisterRequest, request: Request):
             created_at=now,
             last_updated=now
         )
-        save_session(new_session)
+        save_session_in_background(new_session)
 
         return {
             "message": "Account created!",
@@ -249,7 +405,7 @@ async def register(req: RegisterRequest, request: Request):
 async def save_addresses(req: SaveAddressesRequest, request: Request):
     """Save wallet addresses for a user"""
     request_data = req
-    session = load_session(request_data.code)
+    session = await load_session(request_data.code)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found. Please register first.")
 
@@ -259,7 +415,7 @@ async def save_addresses(req: SaveAddressesRequest, request: Request):
     # Update session with only valid addresses
     session.addresses = valid_addresses
     session.last_updated = datetime.now().isoformat()
-    save_session(session)
+    await save_session(session)
 
     response = {
         "message": "Addresses saved successfully",
@@ -276,7 +432,7 @@ async def save_addresses(req: SaveAddressesRequest, request: Request):
 @app.get("/api/addresses/{code}")
 async def get_addresses(code: str):
     """Get saved addresses for a user"""
-    session = load_session(code)
+    session = await load_session(code)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -285,90 +441,155 @@ async def get_addresses(code: str):
         "last_updated": session.last_updated
     }
 
-async def calculate_portfolio_generator(code: str):
-    """Generator that yields progress updates during portfolio calculation"""
+def aggregate_portfolio(wallet_analyses: List[WalletRow]) -> tuple[Dict[str, float], Dict[str, Dict]]:
+    """
+    Sum portfolio totals and per-token breakdown in a single pass
+    Returns: (totals, token_breakdown)
+    """
+    total_value_usd = daily_earnings = monthly_earnings = yearly_earnings = 0.0
+    token_breakdown = {}
+
+    for wallet in wallet_analyses:
+        total_value_usd += wallet.total_value_usd
+        daily_earnings += wallet.daily_earnings
+        monthly_earnings += wallet.monthly_earnings
+        yearly_earnings += wallet.yearly_earnings
+
+        breakdown = token_breakdown.get(wallet.token_symbol)
+        if breakdown is None:
+            breakdown = token_breakdown[wallet.token_symbol] = {
+                'total_balance': 0.0,
+                'total_value_usd': 0.0,
+                'daily_earnings': 0.0,
+                'monthly_earnings': 0.0,
+                'yearly_earnings': 0.0,
+                'price': wallet.token_price,
+                'apr': wallet.apr
+            }
 
-    def send_event(event_type: str, data: dict):
-        """Send SSE event"""
-        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+        breakdown['total_balance'] += wallet.total_balance
+        breakdown['total_value_usd'] += wallet.total_value_usd
+        breakdown['daily_earnings'] += wallet.daily_earnings
+        breakdown['monthly_earnings'] += wallet.monthly_earnings
+        breakdown['yearly_earnings'] += wallet.yearly_earnings
+
+    totals = {
+        'total_value_usd': total_value_usd,
+        'daily_earnings': daily_earnings,
+        'monthly_earnings': monthly_earnings,
+        'yearly_earnings': yearly_earnings
+    }
+    return totals, token_breakdown
+
+# Pre-encoded SSE frame headers for every event type the stream sends
+_SSE_PREFIXES = {
+    event_type: f"event: {event_type}\ndata: ".encode()
+    for event_type in ("progress", "found", "warning", "error", "complete")
+}
 
+async def portfolio_events(code: str):
+    """
+    Run a portfolio calculation, yielding (event_type, data) progress events
+    Ends with a 'complete' event carrying the result, or an 'error' event.
+    Shared by the streaming and non-streaming calculate endpoints.
+    """
     try:
         # Load session
-        session = load_session(code)
+        session = await load_session(code)
         if not session:
-            yield send_event("error", {"message": "Session not found"})
+            yield ("error", {"message": "Session not found"})
             return
 
         if not session.addresses:
-            yield send_event("error", {"message": "No addresses saved"})
+            yield ("error", {"message": "No addresses saved"})
             return
 
-        yield send_event("progress", {"message": "💎 Loading token prices from Numia API cache...", "step": 1, "total": 10})
+        yield ("progress", {"message": "💎 Loading token prices from Numia API cache...", "step": 1, "total": 10})
 
         # Get cached price/APR data from Numia
-        cached_data = price_scraper.load_cache()
+        cached_data = get_latest_prices()
         if not cached_data:
-            yield send_event("progress", {"message": "⚠️  Fetching fresh prices from Numia API...", "step": 2, "total": 10})
-            cached_data = await price_scraper.scrape_all()
+            yield ("progress", {"message": "⚠️  Fetching fresh prices from Numia API...", "step": 2, "total": 10})
+            cached_data = await refresh_prices()
         else:
-            yield send_event("progress", {"message": f"✅ Loaded prices for {len(cached_data)} tokens", "step": 2, "total": 10})
+            yield ("progress", {"message": f"✅ Loaded prices for {len(cached_data)} tokens", "step": 2, "total": 10})
 
         # Analyze wallets
-        yield send_event("progress", {"message": f"🔍 Analyzing {len(session.addresses)} wallet address(es)...", "step": 3, "total": 10})
+        yield ("progress", {"message": f"🔍 Analyzing {len(session.addresses)} wallet address(es)...", "step": 3, "total": 10})
 
-        async with WalletAddressAnalyzer() as analyzer:
-            wallet_analyses = []
-            address_count = 0
+        analyzer = app.state.analyzer
+        wallet_analyses = []
+        address_count = 0
+        probed_chain_addresses = set()  # Addresses already checked via another saved address
 
+        # Check balance on a single chain
+        async def check_chain(chain_name, chain_address):
+            try:
+                # The analyzer rate limits its REST requests per host
+                wallet_balance = await analyzer.get_wallet_balance(chain_address, chain_name)
+                if not wallet_balance or wallet_balance.total_balance == 0:
+                    return None
+                return (chain_name, chain_address, wallet_balance)
+            except Exception:
+                return None
+
+        # Only chains whose token has price data - a balance elsewhere couldn't be valued
+        priced_chains = {
+            chain_name for chain_name, token_symbol in app.state.chain_tokens.items()
+            if token_symbol in cached_data
+        }
+
+        # Start the lookups for every address up front so addresses don't wait
+        # on each other; results are still reported address by address below.
+        # None marks an address that can't be converted or was already covered.
+        chain_tasks = []
+        for address in session.addresses:
+            all_chain_addresses = Bech32Converter.get_all_chain_addresses(address)
+            if not all_chain_addresses or all_chain_addresses['cosmos'] in probed_chain_addresses:
+                chain_tasks.append(None)
+                continue
+            probed_chain_addresses.add(all_chain_addresses['cosmos'])
+            chain_tasks.append([
+                asyncio.create_task(check_chain(chain_name, chain_address))
+                for chain_name, chain_address in all_chain_addresses.items()
+                if chain_name in priced_chains
+            ])
+
+        try:
             for address in session.addresses:
                 address_count += 1
                 try:
-                    # Convert address to all chain variants using bech32
-                    yield send_event("progress", {"message": f"🔄 Converting address {address_count}/{len(session.addresses)} to chain variants...", "step": 3 + address_count, "total": 10})
-
+                    # Chain variants were derived (and their lookups started) above
                     all_chain_addresses = Bech32Converter.get_all_chain_addresses(address)
 
                     if not all_chain_addresses:
-                        yield send_event("warning", {"message": f"⚠️  Could not convert address: {address[:12]}..."})
+                        yield ("warning", {"message": f"⚠️  Could not convert address: {address[:12]}..."})
+                        continue
+
+                    # Same key saved under another prefix (e.g. cosmos1... and osmo1...) - already checked
+                    if chain_tasks[address_count - 1] is None:
+                        yield ("progress", {"message": f"⏭️  Address {address_count} is the same wallet as an earlier one, skipping", "step": 4 + address_count, "total": 10})
                         continue
 
-                    yield send_event("progress", {"message": f"✅ Checking {len(all_chain_addresses)} chains for address {address_count}...", "step": 4 + address_count, "total": 10})
-
-                    # Check balance on all chains in parallel
-                    async def check_chain(chain_name, chain_address):
-                        try:
-                            wallet_balance = await analyzer.get_wallet_balance(chain_address, chain_name)
-                            if not wallet_balance or wallet_balance.total_balance == 0:
-                                return None
-                            return (chain_name, chain_address, wallet_balance)
-                        except Exception:
-                            return None
-
-                    # Create tasks for all chains
-                    chain_tasks = [
-                        check_chain(chain_name, chain_address)
-                        for chain_name, chain_address in all_chain_addresses.items()
-                    ]
-
-                    # Wait for all chain checks to complete
-                    chain_results = await asyncio.gather(*chain_tasks)
-
-                    # Process results
-                    for result in chain_results:
+                    yield ("progress", {"message": f"✅ Checking {len(chain_tasks[address_count - 1])} chains for address {address_count}/{len(session.addresses)}...", "step": 4 + address_count, "total": 10})
+
+                    # Process results as each chain responds so events stream out
+                    for next_result in asyncio.as_completed(chain_tasks[address_count - 1]):
+                        result = await next_result
                         if result is None:
                             continue
 
                         chain_name, chain_address, wallet_balance = result
 
                         # Found balance!
-                        yield send_event("found", {"message": f"💰 Found {wallet_balance.total_balance:.2f} {wallet_balance.token_symbol} on {chain_name}", "chain": chain_name, "token": wallet_balance.token_symbol, "balance": wallet_balance.total_balance})
+                        yield ("found", {"message": f"💰 Found {wallet_balance.total_balance:.2f} {wallet_balance.token_symbol} on {chain_name}", "chain": chain_name, "token": wallet_balance.token_symbol, "balance": wallet_balance.total_balance})
 
                         # Get token data
                         token_symbol = wallet_balance.token_symbol
                         token_data = cached_data.get(token_symbol)
 
                         if not token_data:
-                            yield send_event("warning", {"message": f"⚠️  No price data for {token_symbol}"})
+                            yield ("warning", {"message": f"⚠️  No price data for {token_symbol}"})
                             continue
 
                         # Check if APR is valid (not 0 or error status)
@@ -386,70 +607,55 @@ async def calculate_portfolio_generator(code: str):
                             daily_earnings = 0
                             monthly_earnings = 0
 
-                        wallet_analyses.append({
-                            'address': chain_address,
-                            'original_address': address,
-                            'chain': chain_name,
-                            'token_symbol': token_symbol,
-                            'available_balance': wallet_balance.available_balance,
-                            'delegated_balance': wallet_balance.delegated_balance,
-                            'total_balance': wallet_balance.total_balance,
-                            'token_price': token_data.price,
-                            'apr': apr_to_use,
-                            'apr_status': token_data.apr_status,
-                            'apr_source': token_data.apr_source,
-                            'has_apr_issue': has_apr_issue,
-                            'total_value_usd': total_value_usd,
-                            'daily_earnings': daily_earnings,
-                            'monthly_earnings': monthly_earnings,
-                            'yearly_earnings': yearly_earnings
-                        })
+                        wallet_analyses.append(WalletRow(
+                            address=chain_address,
+                            original_address=address,
+                            chain=chain_name,
+                            token_symbol=token_symbol,
+                            available_balance=wallet_balance.available_balance,
+                            delegated_balance=wallet_balance.delegated_balance,
+                            total_balance=wallet_balance.total_balance,
+                            token_price=token_data.price,
+                            apr=apr_to_use,
+                            apr_status=token_data.apr_status,
+                            apr_source=token_data.apr_source,
+                            has_apr_issue=has_apr_issue,
+                            total_value_usd=total_value_usd,
+                            daily_earnings=daily_earnings,
+                            monthly_earnings=monthly_earnings,
+                            yearly_earnings=yearly_earnings
+                        ))
 
                 except Exception as e:
-                    yield send_event("error", {"message": f"❌ Error analyzing address: {str(e)}"})
+                    yield ("error", {"message": f"❌ Error analyzing address: {str(e)}"})
                     continue
+        finally:
+            # Client went away (generator closed) - stop the remaining lookups
+            for tasks in chain_tasks:
+                for task in tasks or ():
+                    task.cancel()
 
         # Calculate totals
-        yield send_event("progress", {"message": "📊 Calculating portfolio totals...", "step": 9, "total": 10})
+        yield ("progress", {"message": "📊 Calculating portfolio totals...", "step": 9, "total": 10})
 
         # Check for APR issues
         tokens_with_apr_issues = set()
         for wallet in wallet_analyses:
-            if wallet.get('has_apr_issue'):
-                tokens_with_apr_issues.add(wallet['token_symbol'])
+            if wallet.has_apr_issue:
+                tokens_with_apr_issues.add(wallet.token_symbol)
 
         if tokens_with_apr_issues:
             issue_list = ", ".join(sorted(tokens_with_apr_issues))
-            yield send_event("warning", {"message": f"⚠️  APR scraping failed for: {issue_list}. Earnings set to $0. Using fallback APRs where available."})
-
-        total_portfolio_value = sum(w['total_value_usd'] for w in wallet_analyses)
-        total_daily = sum(w['daily_earnings'] for w in wallet_analyses)
-        total_monthly = sum(w['monthly_earnings'] for w in wallet_analyses)
-        total_yearly = sum(w['yearly_earnings'] for w in wallet_analyses)
+            yield ("warning", {"message": f"⚠️  APR scraping failed for: {issue_list}. Earnings set to $0. Using fallback APRs where available."})
 
-        # Group by token
-        token_breakdown = {}
-        for wallet in wallet_analyses:
-            token = wallet['token_symbol']
-            if token not in token_breakdown:
-                token_breakdown[token] = {
-                    'total_balance': 0.0,
-                    'total_value_usd': 0.0,
-                    'daily_earnings': 0.0,
-                    'monthly_earnings': 0.0,
-                    'yearly_earnings': 0.0,
-                    'price': wallet['token_price'],
-                    'apr': wallet['apr']
-                }
-
-            token_breakdown[token]['total_balance'] += wallet['total_balance']
-            token_breakdown[token]['total_value_usd'] += wallet['total_value_usd']
-            token_breakdown[token]['daily_earnings'] += wallet['daily_earnings']
-            token_breakdown[token]['monthly_earnings'] += wallet['monthly_earnings']
-            token_breakdown[token]['yearly_earnings'] += wallet['yearly_earnings']
+        totals, token_breakdown = aggregate_portfolio(wallet_analyses)
+        total_portfolio_value = totals['total_value_usd']
+        total_daily = totals['daily_earnings']
+        total_monthly = totals['monthly_earnings']
+        total_yearly = totals['yearly_earnings']
 
         # Send completion with results
-        yield send_event("progress", {"message": f"✅ Analysis complete! Found ${total_portfolio_value:.2f} across {len(wallet_analyses)} wallet(s)", "step": 10, "total": 10})
+        yield ("progress", {"message": f"✅ Analysis complete! Found ${total_portfolio_value:.2f} across {len(wallet_analyses)} wallet(s)", "step": 10, "total": 10})
 
         result = {
             "code": code,
@@ -462,11 +668,18 @@ async def calculate_portfolio_generator(code: str):
             "last_updated": datetime.now().isoformat()
         }
 
-        yield send_event("complete", result)
+        yield ("complete", result)
 
     except Exception as e:
         logger.error(f"Error in portfolio calculation: {e}")
-        yield send_event("error", {"message": f"❌ Error: {str(e)}"})
+        yield ("error", {"message": f"❌ Error: {str(e)}"})
+
+
+async def calculate_portfolio_generator(code: str):
+    """Generator that yields progress updates during portfolio calculation"""
+    async with aclosing(portfolio_events(code)) as events:
+        async for event_type, data in events:
+            yield _SSE_PREFIXES[event_type] + orjson.dumps(data) + b"\n\n"
 
 
 @app.get("/api/calculate/stream/{code}")
@@ -481,7 +694,8 @@ async def calculate_portfolio_stream(code: str, request: Request):
         calculate_portfolio_generator(code),
         media_type="text/event-stream",
         headers={
-            "Cache-Control": "no-cache",
+            # no-transform keeps proxies from compressing (and so buffering) the stream
+            "Cache-Control": "no-cache, no-transform",
             "X-Accel-Buffering": "no"
         }
     )
@@ -508,123 +722,30 @@ async def _calculate_portfolio_internal(code: str):
     """Internal calculation logic with timeout"""
 
     # Load session
-    session = load_session(code)
+    session = await load_session(code)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
     if not session.addresses:
         raise HTTPException(status_code=400, detail="No addresses saved")
 
-    # Get cached price/APR data from Numia
-    logger.info("💎 Loading token prices from Numia API cache...")
-    cached_data = price_scraper.load_cache()
-    if not cached_data:
-        logger.warning("⚠️  No cached data available, fetching from Numia API now...")
-        cached_data = await price_scraper.scrape_all()
-        logger.info(f"✅ Fetched fresh data for {len(cached_data)} tokens from Numia API")
-    else:
-        logger.info(f"✅ Using cached Numia prices for {len(cached_data)} tokens")
-
-    # Analyze wallets (simplified without progress updates)
-    async with WalletAddressAnalyzer() as analyzer:
-        wallet_analyses = []
-
-        # Helper function to check a single chain
-        async def check_chain_balance(address, chain_name, chain_address):
-            try:
-                wallet_balance = await analyzer.get_wallet_balance(chain_address, chain_name)
-                if not wallet_balance or wallet_balance.total_balance == 0:
-                    return None
-
-                token_symbol = wallet_balance.token_symbol
-                token_data = cached_data.get(token_symbol)
-                if not token_data:
-                    return None
-
-                total_value_usd = wallet_balance.total_balance * token_data.price
-                yearly_earnings = wallet_balance.delegated_balance * (token_data.apr / 100) * token_data.price
-                daily_earnings = yearly_earnings / 365
-                monthly_earnings = yearly_earnings / 12
-
-                return {
-                    'address': chain_address,
-                    'original_address': address,
-                    'chain': chain_name,
-                    'token_symbol': token_symbol,
-                    'available_balance': wallet_balance.available_balance,
-                    'delegated_balance': wallet_balance.delegated_balance,
-                    'total_balance': wallet_balance.total_balance,
-                    'token_price': token_data.price,
-                    'apr': token_data.apr,
-                    'total_value_usd': total_value_usd,
-                    'daily_earnings': daily_earnings,
-                    'monthly_earnings': monthly_earnings,
-                    'yearly_earnings': yearly_earnings
-                }
-            except Exception:
-                return None
-
-        # Create all tasks for all addresses and chains
-        all_tasks = []
-        for address in session.addresses:
-            try:
-                all_chain_addresses = Bech32Converter.get_all_chain_addresses(address)
-                if not all_chain_addresses:
-                    continue
-
-                for chain_name, chain_address in all_chain_addresses.items():
-                    all_tasks.append(check_chain_balance(address, chain_name, chain_address))
-            except Exception:
-                continue
-
-        # Execute all tasks in parallel
-        results = await asyncio.gather(*all_tasks)
+    # Same calculation as the stream, without forwarding progress updates
+    last_error = None
+    async with aclosing(portfolio_events(code)) as events:
+        async for event_type, data in events:
+            if event_type == "complete":
+                data["wallets"] = [asdict(wallet) for wallet in data["wallets"]]
+                return PortfolioResponse(**data)
+            if event_type == "error":
+                last_error = data["message"]
+                logger.error(f"Portfolio calculation for {code}: {last_error}")
 
-        # Collect valid results
-        wallet_analyses = [r for r in results if r is not None]
-
-    # Aggregate totals
-    total_portfolio_value = sum(w['total_value_usd'] for w in wallet_analyses)
-    total_daily = sum(w['daily_earnings'] for w in wallet_analyses)
-    total_monthly = sum(w['monthly_earnings'] for w in wallet_analyses)
-    total_yearly = sum(w['yearly_earnings'] for w in wallet_analyses)
-
-    # Group by token
-    token_breakdown = {}
-    for wallet in wallet_analyses:
-        token = wallet['token_symbol']
-        if token not in token_breakdown:
-            token_breakdown[token] = {
-                'total_balance': 0.0,
-                'total_value_usd': 0.0,
-                'daily_earnings': 0.0,
-                'monthly_earnings': 0.0,
-                'yearly_earnings': 0.0,
-                'price': wallet['token_price'],
-                'apr': wallet['apr']
-            }
-
-        token_breakdown[token]['total_balance'] += wallet['total_balance']
-        token_breakdown[token]['total_value_usd'] += wallet['total_value_usd']
-        token_breakdown[token]['daily_earnings'] += wallet['daily_earnings']
-        token_breakdown[token]['monthly_earnings'] += wallet['monthly_earnings']
-        token_breakdown[token]['yearly_earnings'] += wallet['yearly_earnings']
-
-    return PortfolioResponse(
-        code=request.code,
-        total_value_usd=total_portfolio_value,
-        daily_earnings=total_daily,
-        monthly_earnings=total_monthly,
-        yearly_earnings=total_yearly,
-        wallets=wallet_analyses,
-        token_breakdown=token_breakdown,
-        last_updated=datetime.now().isoformat()
-    )
+    raise HTTPException(status_code=500, detail=last_error or "Portfolio calculation failed")
 
 @app.get("/api/health")
 async def health():
     """Health check endpoint"""
-    cache = price_scraper.load_cache()
+    cache = get_latest_prices()
     return {
         "status": "healthy",
         "price_source": "Numia API (Osmosis DEX)",
@@ -632,12 +753,11 @@ async def health():
         "cache_available": cache is not None
     }
 
-@app.get("/api/config")
-async def get_config():
-    """Get frontend configuration (enabled tokens only)"""
+def build_frontend_config() -> bytes:
+    """Serialize the frontend configuration (enabled tokens only)"""
     enabled_tokens = config.get_all_tokens(enabled_only=True)
 
-    return {
+    return orjson.dumps({
         "tokens": {
             symbol: {
                 "name": token_config.get("name"),
@@ -648,22 +768,24 @@ async def get_config():
             }
             for symbol, token_config in enabled_tokens.items()
         }
-    }
+    })
 
-@app.get("/api/stats")
-async def get_stats():
-    """Get current token prices and APRs for display"""
-    cached_data = price_scraper.load_cache()
+@app.get("/api/config")
+async def get_config():
+    """Get frontend configuration (enabled tokens only)"""
+    return Response(content=app.state.config_json, media_type="application/json")
 
-    if not cached_data:
-        return {
-            "available": False,
-            "message": "No price data available. Please contact @tonyler on Telegram.",
-            "tokens": []
-        }
+# Token list served by /api/stats, with the price data it was built from
+_stats_tokens: Optional[tuple[Dict[str, TokenData], List[Dict]]] = None
+
+def get_stats_tokens(cached_data: Dict[str, TokenData]) -> List[Dict]:
+    """Get the sorted enabled-token list for /api/stats, rebuilt only when the price data changes"""
+    global _stats_tokens
+    if _stats_tokens is not None and _stats_tokens[0] is cached_data:
+        return _stats_tokens[1]
 
     # Only return enabled tokens
-    enabled_symbols = config.get_enabled_tokens()
+    enabled_symbols = app.state.enabled_symbols
 
     tokens = []
     for symbol, data in cached_data.items():
@@ -681,25 +803,48 @@ async def get_stats():
     # Sort by symbol
     tokens.sort(key=lambda x: x['symbol'])
 
-    return {
+    _stats_tokens = (cached_data, tokens)
+    return tokens
+
+@app.get("/api/stats")
+async def get_stats():
+    """Get current token prices and APRs for display"""
+    cached_data = get_latest_prices()
+
+    if not cached_data:
+        return {
+            "available": False,
+            "message": "No price data available. Please contact @tonyler on Telegram.",
+            "tokens": []
+        }
+
+    return Response(content=orjson.dumps({
         "available": True,
         "message": "Data from Numia API (Osmosis DEX)",
-        "tokens": tokens,
+        "tokens": get_stats_tokens(cached_data),
         "last_check": datetime.now().isoformat()
-    }
+    }), media_type="application/json")
 
 async def background_price_collector():
     """Background task to collect prices and APRs every 10 minutes"""
+    next_run = time.monotonic()
+    retry_delay = PRICE_RETRY_MIN_DELAY
     while True:
         try:
             logger.info("🔄 Running background price/APR collection...")
-            await price_scraper.scrape_all()
+            await refresh_prices()
             logger.info("✅ Background collection complete")
+
+            # Keep a fixed cadence however long the run took
+            retry_delay = PRICE_RETRY_MIN_DELAY
+            next_run = max(next_run + PRICE_COLLECTION_INTERVAL, time.monotonic())
         except Exception as e:
-            logger.error(f"❌ Background collection error: {e}")
+            # Retry sooner after a failure, backing off up to the normal interval
+            logger.error(f"❌ Background collection error: {e} (retrying in {retry_delay}s)")
+            next_run = time.monotonic() + retry_delay
+            retry_delay = min(retry_delay * 2, PRICE_COLLECTION_INTERVAL)
 
-        # Wait 10 minutes before next run
-        await asyncio.sleep(600)
+        await asyncio.sleep(max(0, next_run - time.monotonic()))
 
 @app.on_event("startup")
 async def startup_event():
@@ -710,12 +855,23 @@ async def startup_event():
 
     # Try to load from cache immediately (non-blocking)
     try:
-        cached = price_scraper.load_cache()
+        cached = get_latest_prices()
         if cached:
             logger.info(f"📂 Loaded cached data for {len(cached)} tokens")
     except Exception as e:
         logger.warning(f"⚠️  No cache available: {e}")
 
+    # Config only changes on restart, so serialize what the endpoints serve once
+    app.state.config_json = build_frontend_config()
+    app.state.enabled_symbols = frozenset(config.get_enabled_tokens())
+    app.state.chain_tokens = {
+        chain_name: network_config['token_symbol']
+        for chain_name, network_config in config.get_all_network_configs().items()
+    }
+
+    # One wallet analyzer (and HTTP connection pool) for the app's lifetime
+    app.state.analyzer = await WalletAddressAnalyzer().__aenter__()
+
     # Start background collection task (runs immediately, then every 10 minutes)
     logger.info("⏰ Starting background collector (runs now, then every 10 minutes)")
     asyncio.create_task(background_price_collector())
@@ -727,9 +883,18 @@ async def shutdown_event():
     """Run on shutdown"""
     logger.info("👋 Shutting down PassivMOS Webapp...")
 
+    # Close the shared wallet analyzer's HTTP session
+    await app.state.analyzer.__aexit__(None, None, None)
+
+    # Close the price scraper's Numia HTTP session
+    await price_scraper.close()
+
+    # Release the shared APR scraper's browser and HTTP session
+    from apr_scraper import close_scraper
+    await close_scraper()
+
 if __name__ == "__main__":
     import uvicorn
-    import os
     # Use PORT from environment or default to 8000
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
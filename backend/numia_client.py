@@ -4,10 +4,12 @@ Numia API Client
 Handles authentication and requests to Numia API for price and APR data
 """
 import aiohttp
+import asyncio
 import logging
 import os
 import json
-from typing import Dict, List, Optional
+import random
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -23,6 +25,10 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Transient upstream failures worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_ATTEMPTS = 3
+
 
 @dataclass
 class TokenPrice:
@@ -66,6 +72,52 @@ class NumiaAPIClient:
         self.token_denoms = config.get_token_denoms()
         self.apr_config = config.get_all_apr_configs()
 
+        self.session = None  # aiohttp session (lazy loaded, reused across calls)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared aiohttp session, creating it on first use"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, limit_per_host=10, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=15, connect=5)
+            )
+        return self.session
+
+    async def close(self):
+        """Close the shared aiohttp session"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def _get(self, url: str, params=None, timeout: float = 15) -> Tuple[int, Any]:
+        """
+        GET a Numia endpoint, retrying transient failures with exponential backoff
+        Returns (status, body) - parsed JSON on 200, the error text otherwise.
+        """
+        session = self._get_session()
+        for attempt in range(MAX_ATTEMPTS):
+            last_attempt = attempt == MAX_ATTEMPTS - 1
+            try:
+                async with session.get(
+                    url,
+                    params=params,
+                    headers=self._get_auth_headers(),
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    if response.status == 200:
+                        return response.status, await response.json()
+                    error_text = await response.text()
+                    if response.status not in RETRY_STATUSES or last_attempt:
+                        return response.status, error_text
+                    logger.warning(f"Numia {url} returned {response.status}, retrying...")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                logger.warning(f"Numia {url} request failed ({e}), retrying...")
+
+            # 0.3s, 0.6s, ... with jitter so retries don't line up
+            await asyncio.sleep(0.3 * 2 ** attempt * random.uniform(0.5, 1.5))
+
     def _get_auth_headers(self) -> Dict[str, str]:
         """Get authentication headers for API requests"""
         if not self.api_key:
@@ -92,31 +144,23 @@ class NumiaAPIClient:
         params = [('currencies', symbol.upper()) for symbol in symbols]
 
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.osmosis_url}/prices"
-
-                async with session.get(
-                    url,
-                    params=params,
-                    headers=self._get_auth_headers(),
-                    timeout=aiohttp.ClientTimeout(total=15)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        # Response format: [{"asset": "OSMO", "denom": "uosmo", "price_in_usdc": 0.117}]
-                        if isinstance(data, list):
-                            for item in data:
-                                if 'asset' in item and 'price_in_usdc' in item:
-                                    symbol = item['asset'].upper()
-                                    price = float(item['price_in_usdc'])
-                                    prices[symbol] = price
-                                    logger.info(f"  ✅ {symbol}: ${price:.4f}")
-
-                        logger.info(f"✅ Fetched {len(prices)} prices from Osmosis")
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Osmosis API error {response.status}: {error_text}")
+            url = f"{self.osmosis_url}/prices"
+            status, data = await self._get(url, params=params, timeout=15)
+
+            if status == 200:
+                # Response format: [{"asset": "OSMO", "denom": "uosmo", "price_in_usdc": 0.117}]
+                if isinstance(data, list):
+                    for item in data:
+                        if 'asset' in item and 'price_in_usdc' in item:
+                            symbol = item['asset'].upper()
+                            price = float(item['price_in_usdc'])
+                            prices[symbol] = price
+                            # Per-token detail only; formatted lazily since DEBUG is usually off
+                            logger.debug("  ✅ %s: $%.4f", symbol, price)
+
+                logger.info(f"✅ Fetched {len(prices)} prices from Osmosis")
+            else:
+                logger.error(f"Osmosis API error {status}: {data}")
 
         except Exception as e:
             logger.error(f"Error fetching Osmosis prices: {e}")
@@ -133,42 +177,34 @@ class NumiaAPIClient:
         logger.info("Fetching Osmosis staking APR...")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.osmosis_url}/apr"
-
-                async with session.get(
-                    url,
-                    headers=self._get_auth_headers(),
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        # Parse APR from response
-                        # Format may vary - adjust as needed
-                        if isinstance(data, dict):
-                            if 'apr' in data:
-                                apr = float(data['apr'])
-                            elif 'staking_apr' in data:
-                                apr = float(data['staking_apr'])
-                            else:
-                                # Try to find APR in nested data
-                                apr = None
-                                for value in data.values():
-                                    if isinstance(value, (int, float)):
-                                        apr = float(value)
-                                        break
-                        elif isinstance(data, (int, float)):
-                            apr = float(data)
-                        else:
-                            apr = None
-
-                        if apr is not None:
-                            logger.info(f"✅ Osmosis staking APR: {apr}%")
-                            return apr
+            url = f"{self.osmosis_url}/apr"
+            status, data = await self._get(url, timeout=10)
+
+            if status == 200:
+                # Parse APR from response
+                # Format may vary - adjust as needed
+                if isinstance(data, dict):
+                    if 'apr' in data:
+                        apr = float(data['apr'])
+                    elif 'staking_apr' in data:
+                        apr = float(data['staking_apr'])
                     else:
-                        error_text = await response.text()
-                        logger.error(f"APR API error {response.status}: {error_text}")
+                        # Try to find APR in nested data
+                        apr = None
+                        for value in data.values():
+                            if isinstance(value, (int, float)):
+                                apr = float(value)
+                                break
+                elif isinstance(data, (int, float)):
+                    apr = float(data)
+                else:
+                    apr = None
+
+                if apr is not None:
+                    logger.info(f"✅ Osmosis staking APR: {apr}%")
+                    return apr
+            else:
+                logger.error(f"APR API error {status}: {data}")
 
         except Exception as e:
             logger.error(f"Error fetching staking APR: {e}")
@@ -185,24 +221,26 @@ class NumiaAPIClient:
         Returns:
             Dict mapping symbol to TokenPrice object
         """
+        symbols = [symbol.upper() for symbol in symbols]
         token_prices = {}
 
         # Fetch prices from Osmosis using symbols
         if symbols:
             prices = await self.get_osmosis_prices(symbols)
 
+            now = datetime.now(timezone.utc)
             for symbol, price in prices.items():
                 denom = self.token_denoms.get(symbol)
                 token_prices[symbol] = TokenPrice(
                     symbol=symbol,
                     denom=denom or 'unknown',
                     price=price,
-                    last_updated=datetime.now(timezone.utc)
+                    last_updated=now
                 )
 
         # Log tokens without prices
         for symbol in symbols:
-            if symbol.upper() not in token_prices:
+            if symbol not in token_prices:
                 logger.warning(f"  {symbol}: No price data available")
 
         return token_prices
@@ -222,25 +260,25 @@ class NumiaAPIClient:
                 'ATOM': {'apr': 16.8, 'status': 'ok'/'fallback', 'source': 'keplr/cached/config'}
             }
         """
+        symbols = [symbol.upper() for symbol in symbols]
         aprs = {}
 
         if use_scraper:
             try:
-                from apr_scraper import APRScraper
+                from apr_scraper import get_scraper
 
                 logger.info(f"Fetching APRs for {len(symbols)} tokens...")
 
-                async with APRScraper() as scraper:
-                    # This NEVER fails - always returns values (fresh/stale/fallback)
-                    scraped_aprs = await scraper.get_multiple_aprs(symbols)
+                scraper = await get_scraper()
+                # This NEVER fails - always returns values (fresh/stale/fallback)
+                scraped_aprs = await scraper.get_multiple_aprs(symbols)
 
-                # Convert to expected format
-                for symbol, apr_value in scraped_aprs.items():
-                    symbol_upper = symbol.upper()
+                # Convert to expected format (the scraper keys results by upper-case symbol)
+                for symbol_upper, apr_value in scraped_aprs.items():
 
                     # Check if this token has skip_apr_scraping enabled
                     token_config = self.apr_config.get(symbol_upper, {})
-                    skip_scraping = config.get_token_config(symbol_upper).get('skip_apr_scraping', False) if config.get_token_config(symbol_upper) else False
+                    skip_scraping = (config.get_token_config(symbol_upper) or {}).get('skip_apr_scraping', False)
 
                     if apr_value == 0 and not skip_scraping:
                         # Scraping failed, no cache available, and NOT a skip_scraping token
@@ -270,19 +308,13 @@ class NumiaAPIClient:
                 # Fall through to config-only mode
 
         # Fallback: If scraper disabled or failed catastrophically, return 0
-        if not use_scraper or not aprs:
-            logger.error("APR scraper disabled or failed, returning 0 for all tokens")
-            for symbol in symbols:
-                symbol_upper = symbol.upper()
-
-                if symbol_upper in aprs:
-                    continue
-
-                aprs[symbol_upper] = {
-                    'apr': 0.0,
-                    'status': 'error',
-                    'source': 'scraper_disabled'
-                }
+        # (aprs is only empty here when no symbol got a result)
+        if not aprs:
+            logger.error(f"APR scraper disabled or failed, returning 0 for all {len(symbols)} tokens")
+            return {
+                symbol_upper: {'apr': 0.0, 'status': 'error', 'source': 'scraper_disabled'}
+                for symbol_upper in symbols
+            }
 
         return aprs
 
@@ -303,6 +335,7 @@ async def test_client():
     # Test APR fetching
     print("\nFetching APRs...")
     aprs = await client.get_all_aprs(symbols)
+    await client.close()
 
     print("\n" + "=" * 60)
     print("Results:")
@@ -317,5 +350,4 @@ async def test_client():
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(test_client())
@@ -9,15 +9,19 @@ import os
 from typing import Dict, Optional
 from dataclasses import dataclass
 from datetime import datetime, timezone
-import json
+import orjson
 from pathlib import Path
 from config_loader import config
+from single_flight import SingleFlight
 
 # Import Numia API client
 from numia_client import NumiaAPIClient
 
 logger = logging.getLogger(__name__)
 
+# APR entry for a token the APR source returned nothing for
+DEFAULT_APR_INFO = {'apr': 10.0, 'status': 'error', 'source': 'default'}
+
 @dataclass
 class TokenData:
     """Token price and APR data"""
@@ -43,36 +47,73 @@ class PriceAPRScraper:
         # Supported tokens - dynamically loaded from config
         self.tokens = config.get_enabled_tokens()
 
+        # In-flight scrape_all run, shared by concurrent callers
+        self._inflight = SingleFlight()
+
+        # Parsed cache file, reused until the file's mtime changes
+        self._cache_mem: Optional[Dict[str, TokenData]] = None
+        self._cache_mtime: float = 0.0
+
     async def scrape_all(self) -> Dict[str, TokenData]:
-        """Fetch all token data from Numia API and cache it"""
+        """
+        Fetch all token data from Numia API and cache it
+        Concurrent callers share one in-flight run instead of each hitting upstream.
+        """
+        # One caller being cancelled doesn't cancel the run for the rest
+        return await self._inflight.run(None, self._scrape_all)
+
+    async def _scrape_all(self) -> Dict[str, TokenData]:
+        """Body of scrape_all - one fetch, combine and cache pass"""
         logger.info("Fetching token data from Numia API...")
 
         try:
-            # Fetch prices from Numia
-            price_data = await self.numia_client.get_token_prices(self.tokens)
-
-            # Fetch APRs from Numia
-            apr_data = await self.numia_client.get_all_aprs(self.tokens)
+            # Prices and APRs come from independent sources - fetch them concurrently
+            # so a failure in one doesn't cancel the other
+            price_data, apr_data = await asyncio.gather(
+                self.numia_client.get_token_prices(self.tokens),
+                self.numia_client.get_all_aprs(self.tokens),
+                return_exceptions=True
+            )
+
+            price_failed = isinstance(price_data, Exception)
+            apr_failed = isinstance(apr_data, Exception)
+            if price_failed and apr_failed:
+                raise price_data
+
+            # Fill a failed source from the last cached values
+            if price_failed or apr_failed:
+                failed_error = price_data if price_failed else apr_data
+                logger.error(f"Error fetching {'prices' if price_failed else 'APRs'}: {failed_error}, using cached values")
+                cached = self.load_cache() or {}
+                if price_failed:
+                    prices = {symbol: data.price for symbol, data in cached.items()}
+                if apr_failed:
+                    apr_data = {
+                        symbol: {'apr': data.apr, 'status': data.apr_status, 'source': data.apr_source}
+                        for symbol, data in cached.items()
+                    }
+            if not price_failed:
+                prices = {symbol: price_obj.price for symbol, price_obj in price_data.items()}
 
             # Combine data
-            token_data = {}
-            for symbol in self.tokens:
-                price_obj = price_data.get(symbol)
-                price = price_obj.price if price_obj else 0.0
-
-                apr_info = apr_data.get(symbol, {'apr': 10.0, 'status': 'error', 'source': 'default'})
-
-                token_data[symbol] = TokenData(
+            now = datetime.now(timezone.utc)
+            get_price = prices.get
+            get_apr = apr_data.get
+            token_data = {
+                symbol: TokenData(
                     symbol=symbol,
-                    price=price,
+                    price=get_price(symbol, 0.0),
                     apr=apr_info['apr'],
                     apr_status=apr_info['status'],
                     apr_source=apr_info['source'],
-                    last_updated=datetime.now(timezone.utc)
+                    last_updated=now
                 )
+                for symbol in self.tokens
+                for apr_info in [get_apr(symbol, DEFAULT_APR_INFO)]
+            }
 
             # Cache the data
-            self._save_cache(token_data)
+            await asyncio.to_thread(self._save_cache, token_data)
 
             logger.info(f"Fetched data for {len(token_data)} tokens")
             return token_data
@@ -88,7 +129,10 @@ class PriceAPRScraper:
 
 
     def _save_cache(self, token_data: Dict[str, TokenData]):
-        """Save token data to cache file"""
+        """
+        Save token data to cache file (blocking - run in a thread)
+        Written to a temp file and swapped in, so readers never see a partial file.
+        """
         cache_data = {
             symbol: {
                 'symbol': data.symbol,
@@ -101,19 +145,31 @@ class PriceAPRScraper:
             for symbol, data in token_data.items()
         }
 
-        with open(self.cache_file, 'w') as f:
-            json.dump(cache_data, f, indent=2)
+        temp_file = self.cache_file.with_suffix('.tmp')
+        temp_file.write_bytes(orjson.dumps(cache_data, option=orjson.OPT_INDENT_2))
+        os.replace(temp_file, self.cache_file)
+
+        # What was just written is what load_cache would parse back
+        self._cache_mem = token_data
+        self._cache_mtime = self.cache_file.stat().st_mtime
 
         logger.info(f"💾 Cached data saved to {self.cache_file}")
 
     def load_cache(self) -> Optional[Dict[str, TokenData]]:
-        """Load token data from cache"""
-        if not self.cache_file.exists():
+        """
+        Load token data from cache
+        The parsed result is kept in memory and only re-read when the file changes.
+        """
+        try:
+            mtime = self.cache_file.stat().st_mtime
+        except FileNotFoundError:
             return None
 
+        if self._cache_mem is not None and mtime == self._cache_mtime:
+            return self._cache_mem
+
         try:
-            with open(self.cache_file, 'r') as f:
-                cache_data = json.load(f)
+            cache_data = orjson.loads(self.cache_file.read_bytes())
 
             token_data = {}
             for symbol, data in cache_data.items():
@@ -126,6 +182,9 @@ class PriceAPRScraper:
                     last_updated=datetime.fromisoformat(data['last_updated'])
                 )
 
+            self._cache_mem = token_data
+            self._cache_mtime = mtime
+
             logger.info(f"📂 Loaded cached data for {len(token_data)} tokens")
             return token_data
 
@@ -133,6 +192,10 @@ class PriceAPRScraper:
             logger.error(f"Error loading cache: {e}")
             return None
 
+    async def close(self):
+        """Close the Numia client's HTTP session"""
+        await self.numia_client.close()
+
     def get_token_data(self, symbol: str) -> Optional[TokenData]:
         """Get cached token data for a specific symbol"""
         cache = self.load_cache()
@@ -145,14 +208,17 @@ async def background_scraper(interval: int = 300):
     """Run scraper in background every N seconds"""
     scraper = PriceAPRScraper()
 
-    while True:
-        try:
-            await scraper.scrape_all()
-            logger.info(f"⏰ Next scrape in {interval} seconds...")
-            await asyncio.sleep(interval)
-        except Exception as e:
-            logger.error(f"Background scraper error: {e}")
-            await asyncio.sleep(60)  # Wait 1 minute on error
+    try:
+        while True:
+            try:
+                await scraper.scrape_all()
+                logger.info(f"⏰ Next scrape in {interval} seconds...")
+                await asyncio.sleep(interval)
+            except Exception as e:
+                logger.error(f"Background scraper error: {e}")
+                await asyncio.sleep(60)  # Wait 1 minute on error
+    finally:
+        await scraper.close()
 
 if __name__ == "__main__":
     # Test scraper
@@ -161,6 +227,7 @@ if __name__ == "__main__":
     async def test():
         scraper = PriceAPRScraper()
         data = await scraper.scrape_all()
+        await scraper.close()
         print("\n📊 Scraped Data:")
         for symbol, token_data in data.items():
             print(f"{symbol}: ${token_data.price:.4f} @ {token_data.apr:.2f}% APR")
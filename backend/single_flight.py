@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Single-flight helper
+Concurrent callers asking for the same key share one in-flight coroutine
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    Runs at most one coroutine per key; callers arriving while it runs await the same result
+
+    The shared task is shielded, so one caller being cancelled doesn't cancel it
+    for the others - but once the last caller is gone it's cancelled too, so
+    abandoned work (e.g. a closed SSE stream) stops instead of running on.
+    """
+
+    def __init__(self):
+        # In-flight calls by key: [task, callers awaiting it]
+        self._calls: Dict[Hashable, List] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a call for key is currently running"""
+        return key in self._calls
+
+    async def run(self, key: Hashable, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the in-flight call for key, starting coro_factory() if there is none"""
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(coro_factory())
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        task = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if call[1] == 1:
+                task.cancel()
+                self._forget(key, task)
+            raise
+        finally:
+            call[1] -= 1
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        """Drop a finished or cancelled call, unless a newer one already replaced it"""
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
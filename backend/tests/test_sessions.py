@@ -0,0 +1,62 @@
+"""Session persistence: concurrent saves for one code"""
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import orjson
+
+import main
+
+
+class ConcurrentSaveTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(main, 'SESSIONS_DIR', Path(self.tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        main.get_session_file.cache_clear()
+        self.addCleanup(main.get_session_file.cache_clear)
+        main._session_cache.clear()
+
+        # Slow the blocking write down so unserialized saves would overlap
+        write = main._write_session_file
+
+        def slow_write(session_file, data):
+            time.sleep(0.05)
+            write(session_file, data)
+
+        patcher = mock.patch.object(main, '_write_session_file', slow_write)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _session(self, address: str) -> main.UserSession:
+        return main.UserSession(code='test_code', addresses=[address], created_at='x', last_updated='y')
+
+    def _on_disk(self) -> dict:
+        return orjson.loads(main.get_session_file('test_code').read_bytes())
+
+    async def test_concurrent_saves_last_one_wins(self):
+        await asyncio.gather(
+            main.save_session(self._session('1')),
+            main.save_session(self._session('2')),
+        )
+
+        self.assertEqual(self._on_disk()['addresses'], ['2'])
+        self.assertEqual((await main.load_session('test_code')).addresses, ['2'])
+        self.assertEqual(main._session_locks, {})
+
+    async def test_background_save_then_save(self):
+        main.save_session_in_background(self._session('1'))
+        await main.save_session(self._session('2'))
+
+        self.assertEqual(self._on_disk()['addresses'], ['2'])
+        self.assertEqual((await main.load_session('test_code')).addresses, ['2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
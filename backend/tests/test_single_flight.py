@@ -0,0 +1,67 @@
+"""SingleFlight: sharing, cancellation and cleanup of in-flight calls"""
+import asyncio
+import unittest
+
+from single_flight import SingleFlight
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.flight = SingleFlight()
+        self.started = 0
+        self.cancelled = 0
+
+    async def work(self, result='done', delay=0.1):
+        self.started += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return result
+
+    async def test_concurrent_callers_share_one_run(self):
+        results = await asyncio.gather(*(self.flight.run('key', self.work) for _ in range(5)))
+
+        self.assertEqual(results, ['done'] * 5)
+        self.assertEqual(self.started, 1)
+        self.assertFalse(self.flight.in_flight('key'))
+
+    async def test_cancelling_last_caller_cancels_the_run(self):
+        caller = asyncio.create_task(self.flight.run('key', self.work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.cancelled, 1)
+        self.assertFalse(self.flight.in_flight('key'))
+
+        # The next caller starts a fresh run
+        self.assertEqual(await self.flight.run('key', self.work), 'done')
+        self.assertEqual(self.started, 2)
+
+    async def test_cancelling_one_caller_keeps_the_run_for_the_others(self):
+        first = asyncio.create_task(self.flight.run('key', self.work))
+        second = asyncio.create_task(self.flight.run('key', self.work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        self.assertEqual(await second, 'done')
+        self.assertEqual((self.started, self.cancelled), (1, 0))
+
+    async def test_errors_reach_every_caller_and_clear_the_key(self):
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError('boom')
+
+        results = await asyncio.gather(*(self.flight.run('key', fail) for _ in range(3)), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertFalse(self.flight.in_flight('key'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Wallet analyzer against a local stand-in for a chain's REST endpoint"""
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from wallet_analyzer import WalletAddressAnalyzer
+
+VALIDATORS = [f'cosmosvaloper{i}' for i in range(5)]
+
+
+class ValidatorSetTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.calls = {'set': 0, 'single': 0}
+
+        async def balances(request):
+            return web.json_response({'balances': [{'denom': 'uatom', 'amount': '1000000'}]})
+
+        async def delegations(request):
+            # Staggered so later wallets arrive while the first one's set load is in flight
+            await asyncio.sleep(0.02 * int(request.match_info['address'][-1]))
+            return web.json_response({'delegation_responses': [
+                {'delegation': {'validator_address': validator}, 'balance': {'amount': '2000000'}}
+                for validator in VALIDATORS
+            ]})
+
+        async def validator_set(request):
+            self.calls['set'] += 1
+            await asyncio.sleep(0.2)
+            return web.json_response({
+                'validators': [
+                    {'operator_address': validator, 'description': {'moniker': f'Bonded {validator}'}}
+                    for validator in VALIDATORS
+                ],
+                'pagination': {'next_key': None}
+            })
+
+        async def validator(request):
+            self.calls['single'] += 1
+            return web.json_response({'validator': {'description': {'moniker': 'Single'}}})
+
+        app = web.Application()
+        app.router.add_get('/cosmos/bank/v1beta1/balances/{address}', balances)
+        app.router.add_get('/cosmos/staking/v1beta1/delegations/{address}', delegations)
+        app.router.add_get('/cosmos/staking/v1beta1/validators', validator_set)
+        app.router.add_get('/cosmos/staking/v1beta1/validators/{validator}', validator)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        self.analyzer = WalletAddressAnalyzer()
+        await self.analyzer.__aenter__()
+        self.analyzer.chain_configs['cosmos'] = dict(
+            self.analyzer.chain_configs['cosmos'], rest_endpoints=[f'http://127.0.0.1:{port}']
+        )
+
+    async def asyncTearDown(self):
+        await self.analyzer.__aexit__(None, None, None)
+        await self.runner.cleanup()
+
+    async def test_concurrent_wallets_share_one_validator_set_load(self):
+        balances = await asyncio.gather(*(
+            self.analyzer.get_wallet_balance(f'cosmos1wallet{i}', 'cosmos') for i in range(5)
+        ))
+
+        self.assertEqual(self.calls, {'set': 1, 'single': 0})
+        for balance in balances:
+            self.assertEqual(
+                [d.validator_name for d in balance.delegations],
+                [f'Bonded {validator}' for validator in VALIDATORS]
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
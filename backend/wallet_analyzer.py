@@ -13,17 +13,32 @@ Data sources: Chain REST APIs, cached price/APR data
 import asyncio
 import aiohttp
 import re
-import json
+import orjson
 import os
+import time
+from collections import defaultdict
 from typing import Dict, List, Optional, Tuple, NamedTuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
+from urllib.parse import urlsplit
 import logging
 from config_loader import config
+from single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+MAX_REQUESTS_PER_HOST = 16  # REST requests in flight against any one host
+VALIDATOR_NAME_TTL = 600  # Seconds a looked-up validator name is reused
+VALIDATOR_NAME_CACHE_SIZE = 10000
+VALIDATOR_SET_PAGE_SIZE = 500
+VALIDATOR_SET_MAX_PAGES = 10
+ENDPOINT_HEDGE_DELAY = 1.0  # Seconds before also asking the next REST endpoint
+ENDPOINT_QUARANTINE_FAILURES = 3  # Consecutive failures before an endpoint is tried last
+ENDPOINT_QUARANTINE_SECONDS = 60
+BALANCE_CACHE_TTL = 30  # Seconds a fetched wallet balance is reused
+BALANCE_CACHE_SIZE = 10000
+
+@dataclass(slots=True)
 class DelegationInfo:
     """Single delegation to a validator"""
     validator_address: str  # Validator's address
@@ -32,7 +47,7 @@ class DelegationInfo:
     token_symbol: str      # Token type (ATOM, OSMO, etc)
     apr: float = 0.0      # Annual Percentage Rate
 
-@dataclass
+@dataclass(slots=True)
 class WalletBalance:
     """Complete balance info for one address on one chain"""
     address: str               # Wallet address
@@ -43,7 +58,20 @@ class WalletBalance:
     total_balance: float      # available + delegated
     delegations: List[DelegationInfo]  # List of individual delegations
 
-@dataclass
+@dataclass(slots=True)
+class EndpointHealth:
+    """Rolling health of one REST endpoint, used to order endpoint attempts"""
+    ok: int = 0
+    fail: int = 0
+    consecutive_failures: int = 0
+    last_latency: float = 0.0     # Seconds taken by the last completed fetch
+    quarantined_until: float = 0.0  # Monotonic time until which it's tried last
+
+    def success_rate(self) -> float:
+        """Smoothed success rate - an untried endpoint starts at 0.5"""
+        return (self.ok + 1) / (self.ok + self.fail + 2)
+
+@dataclass(slots=True)
 class WalletAnalysis:
     """Final analysis result for one wallet address"""
     address: str               # Original wallet address
@@ -67,11 +95,43 @@ class WalletAddressAnalyzer:
     def __init__(self, config_path: Optional[str] = None):
         self.session = None  # aiohttp session (lazy loaded)
 
+        # Caps concurrent REST requests against any one host, so batches spread
+        # across chains freely without hammering a single endpoint
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(MAX_REQUESTS_PER_HOST)
+        )
+
+        # Validator names by validator address: (expires_at, name), oldest first.
+        # Validator addresses are chain-specific, so any endpoint's answer is reusable.
+        self._validator_names: Dict[str, Tuple[float, str]] = {}
+        # Recent balances by (address, chain): (expires_at, balance), oldest first
+        self._balances: Dict[Tuple[str, str], Tuple[float, WalletBalance]] = {}
+        # In-flight balance fetches by (address, chain)
+        self._balance_fetches = SingleFlight()
+        # In-flight name lookups, so concurrent wallets share one request per validator
+        self._validator_lookups = SingleFlight()
+        # Bonded validator set loads by endpoint: when each is due again, and in-flight loads
+        self._validator_sets_due: Dict[str, float] = {}
+        self._validator_set_loads = SingleFlight()
+        # Per-endpoint health, so dead or degraded endpoints stop being asked first
+        self._endpoint_health: Dict[str, EndpointHealth] = defaultdict(EndpointHealth)
+
         self.chain_configs = config.get_all_network_configs()
+        self._prefix_to_chain = {
+            chain_config['bech32_prefix']: chain
+            for chain, chain_config in self.chain_configs.items()
+        }
+        self._native_denoms = {
+            chain_config['token_symbol']: self._native_denoms_for(chain_config)
+            for chain_config in self.chain_configs.values()
+        }
 
     async def __aenter__(self):
         """Async context manager entry"""
         self.session = aiohttp.ClientSession(
+            # Pooled keep-alive connections and cached DNS - the app keeps one
+            # analyzer for its lifetime, so handshakes are paid once per host
+            connector=aiohttp.TCPConnector(limit=200, limit_per_host=32, ttl_dns_cache=300, keepalive_timeout=75),
             timeout=aiohttp.ClientTimeout(total=30),
             headers={'User-Agent': 'PassivMOS4-WalletAnalyzer/1.0'}
         )
@@ -84,19 +144,32 @@ class WalletAddressAnalyzer:
 
     def identify_chain_from_address(self, address: str) -> Optional[str]:
         """Identify blockchain from wallet address prefix"""
-        for chain, config in self.chain_configs.items():
-            if address.startswith(config['bech32_prefix']):
-                return chain
-        return None
+        # The bech32 prefix is everything before the last '1'
+        pos = address.rfind('1')
+        if pos < 1:
+            return None
+        return self._prefix_to_chain.get(address[:pos].lower())
+
+    async def get_wallet_balance(self, address: str, chain: str, refresh: bool = False) -> Optional[WalletBalance]:
+        """
+        Get wallet balance and delegations for a specific chain with timeout
+        A balance fetched in the last BALANCE_CACHE_TTL seconds is reused unless refresh is set.
+        Each caller gets its own copy, so it can be modified without touching the cache.
+        """
+        key = (address, chain)
+        if not refresh:
+            cached = self._balances.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                return self._copy_balance(cached[1])
 
-    async def get_wallet_balance(self, address: str, chain: str) -> Optional[WalletBalance]:
-        """Get wallet balance and delegations for a specific chain with timeout"""
         try:
-            # Apply 15 second timeout per chain
-            return await asyncio.wait_for(
+            # Concurrent requests for the same wallet on the same chain share one fetch;
+            # it's cancelled once they're all gone (e.g. the SSE client disconnected),
+            # so abandoned requests don't keep spending RPC quota
+            wallet_balance = await self._balance_fetches.run(key, lambda: asyncio.wait_for(
                 self._get_wallet_balance_internal(address, chain),
-                timeout=15.0
-            )
+                timeout=15.0  # Apply 15 second timeout per chain
+            ))
         except asyncio.TimeoutError:
             logger.error(f"Timeout fetching balance for {address} on {chain}")
             return None
@@ -104,6 +177,24 @@ class WalletAddressAnalyzer:
             logger.error(f"Error analyzing wallet {address} on {chain}: {e}")
             return None
 
+        # Failed fetches aren't cached so the next request tries again
+        if wallet_balance is None:
+            return None
+        self._remember_balance(key, wallet_balance)
+        return self._copy_balance(wallet_balance)
+
+    @staticmethod
+    def _copy_balance(wallet_balance: WalletBalance) -> WalletBalance:
+        """Copy a shared balance along with its delegations"""
+        return replace(wallet_balance, delegations=[replace(d) for d in wallet_balance.delegations])
+
+    def _remember_balance(self, key: Tuple[str, str], wallet_balance: WalletBalance):
+        """Cache a fetched balance, evicting the oldest entry when full"""
+        self._balances.pop(key, None)
+        if len(self._balances) >= BALANCE_CACHE_SIZE:
+            del self._balances[next(iter(self._balances))]
+        self._balances[key] = (time.monotonic() + BALANCE_CACHE_TTL, wallet_balance)
+
     async def _get_wallet_balance_internal(self, address: str, chain: str) -> Optional[WalletBalance]:
         """Internal wallet balance fetch logic"""
         config = self.chain_configs.get(chain)
@@ -111,42 +202,102 @@ class WalletAddressAnalyzer:
             logger.error(f"Unsupported chain: {chain}")
             return None
 
-        # Try multiple endpoints
-        for endpoint in config['rest_endpoints']:
-            try:
-                # Fetch balance and delegations in parallel
-                balance_task = self._fetch_balance(address, endpoint, config)
-                delegations_task = self._fetch_delegations(address, endpoint, config)
-
-                balance_info, delegations = await asyncio.gather(balance_task, delegations_task)
-
-                if balance_info is not None:
-                    total_delegated = sum(d.amount for d in delegations) if delegations else 0.0
-
-                    return WalletBalance(
-                        address=address,
-                        chain=chain,
-                        token_symbol=config['token_symbol'],
-                        available_balance=balance_info,
-                        delegated_balance=total_delegated,
-                        total_balance=balance_info + total_delegated,
-                        delegations=delegations or []
-                    )
-            except Exception as e:
-                logger.warning(f"Failed endpoint {endpoint}: {e}")
-                continue
+        # Hedged requests: start with the first endpoint and bring in the next one
+        # whenever an endpoint fails or the ones in flight are slow to answer.
+        # The first complete answer wins; the rest are cancelled.
+        endpoints = iter(self._endpoints_by_health(config['rest_endpoints']))
+        pending = set()
+        try:
+            while True:
+                endpoint = next(endpoints, None)
+                if endpoint is not None:
+                    pending.add(asyncio.create_task(self._fetch_wallet_balance(address, chain, endpoint, config)))
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=ENDPOINT_HEDGE_DELAY if endpoint is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    wallet_balance = task.result()
+                    if wallet_balance is not None:
+                        return wallet_balance
+        finally:
+            for task in pending:
+                task.cancel()
 
         logger.error(f"All endpoints failed for {chain}")
         return None
 
+    def _endpoints_by_health(self, endpoints: List[str]) -> List[str]:
+        """
+        Order endpoints healthiest first: quarantined ones last, then by success
+        rate and latency. Ties keep the configured order.
+        """
+        now = time.monotonic()
+        health = self._endpoint_health
+        return sorted(endpoints, key=lambda endpoint: (
+            health[endpoint].quarantined_until > now,
+            -health[endpoint].success_rate(),
+            health[endpoint].last_latency
+        ))
+
+    def _record_endpoint_result(self, endpoint: str, ok: bool, latency: float):
+        """Update an endpoint's health after a fetch, quarantining it after repeated failures"""
+        health = self._endpoint_health[endpoint]
+        health.last_latency = latency
+        if ok:
+            health.ok += 1
+            health.consecutive_failures = 0
+            health.quarantined_until = 0.0
+            return
+
+        health.fail += 1
+        health.consecutive_failures += 1
+        if health.consecutive_failures >= ENDPOINT_QUARANTINE_FAILURES:
+            health.quarantined_until = time.monotonic() + ENDPOINT_QUARANTINE_SECONDS
+            if health.consecutive_failures == ENDPOINT_QUARANTINE_FAILURES:
+                logger.warning(f"Endpoint {endpoint} failed {health.consecutive_failures} times in a row, trying it last for {ENDPOINT_QUARANTINE_SECONDS}s")
+
+    async def _fetch_wallet_balance(self, address: str, chain: str, endpoint: str, config: Dict) -> Optional[WalletBalance]:
+        """Fetch balance and delegations from one REST endpoint, or None if it fails"""
+        started = time.monotonic()
+        try:
+            # Fetch balance and delegations in parallel
+            balance_task = self._fetch_balance(address, endpoint, config)
+            delegations_task = self._fetch_delegations(address, endpoint, config)
+
+            balance_info, delegations = await asyncio.gather(balance_task, delegations_task)
+
+            self._record_endpoint_result(endpoint, balance_info is not None, time.monotonic() - started)
+            if balance_info is not None:
+                total_delegated = sum(d.amount for d in delegations) if delegations else 0.0
+
+                return WalletBalance(
+                    address=address,
+                    chain=chain,
+                    token_symbol=config['token_symbol'],
+                    available_balance=balance_info,
+                    delegated_balance=total_delegated,
+                    total_balance=balance_info + total_delegated,
+                    delegations=delegations or []
+                )
+        except Exception as e:
+            self._record_endpoint_result(endpoint, False, time.monotonic() - started)
+            logger.warning(f"Failed endpoint {endpoint}: {e}")
+
+        return None
+
     async def _fetch_balance(self, address: str, endpoint: str, config: Dict) -> Optional[float]:
         """Fetch available balance from REST API"""
         try:
             url = f"{endpoint}/cosmos/bank/v1beta1/balances/{address}"
 
-            async with self.session.get(url) as response:
+            async with self._host_limit(url), self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     balances = data.get('balances', [])
 
                     # Find native token balance
@@ -172,81 +323,154 @@ class WalletAddressAnalyzer:
         try:
             url = f"{endpoint}/cosmos/staking/v1beta1/delegations/{address}"
 
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    delegation_responses = data.get('delegation_responses', [])
-
-                    delegations = []
-                    for delegation in delegation_responses:
-                        delegation_info = delegation.get('delegation', {})
-                        balance = delegation.get('balance', {})
-
-                        validator_address = delegation_info.get('validator_address', '')
-                        amount = float(balance.get('amount', '0')) / (10 ** config['token_decimals'])
-
-                        if amount > 0:
-                            # Get validator name (simplified)
-                            validator_name = await self._get_validator_name(validator_address, endpoint)
-
-                            delegations.append(DelegationInfo(
-                                validator_address=validator_address,
-                                validator_name=validator_name or validator_address[-8:],
-                                amount=amount,
-                                token_symbol=config['token_symbol']
-                            ))
-
-                    return delegations
-                else:
+            async with self._host_limit(url), self.session.get(url) as response:
+                if response.status != 200:
                     logger.warning(f"Delegation API error: {response.status}")
                     return []
+                data = orjson.loads(await response.read())
+
+            # Validator names are resolved after the response is released, so this
+            # request doesn't hold its host slot while waiting on the lookups
+            staked = []
+            for delegation in data.get('delegation_responses', []):
+                delegation_info = delegation.get('delegation', {})
+                balance = delegation.get('balance', {})
+
+                validator_address = delegation_info.get('validator_address', '')
+                amount = float(balance.get('amount', '0')) / (10 ** config['token_decimals'])
+
+                if amount > 0:
+                    staked.append((validator_address, amount))
+
+            # Most delegations are to bonded validators - load that whole set in
+            # one paginated request so their names come straight from the cache
+            if staked:
+                await self._ensure_validator_set(endpoint)
+
+            # Look up the remaining names at once rather than one by one
+            validators = list(dict.fromkeys(validator_address for validator_address, _ in staked))
+            names = await asyncio.gather(*(
+                self._get_validator_name(validator_address, endpoint)
+                for validator_address in validators
+            ))
+            validator_names = dict(zip(validators, names))
+
+            return [
+                DelegationInfo(
+                    validator_address=validator_address,
+                    validator_name=validator_names[validator_address] or validator_address[-8:],
+                    amount=amount,
+                    token_symbol=config['token_symbol']
+                )
+                for validator_address, amount in staked
+            ]
 
         except Exception as e:
             logger.error(f"Error fetching delegations: {e}")
             return []
 
     async def _get_validator_name(self, validator_address: str, endpoint: str) -> Optional[str]:
-        """Get validator moniker/name"""
+        """Get validator moniker/name, from cache when looked up recently"""
+        cached = self._validator_names.get(validator_address)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        # One wallet timing out doesn't cancel the lookup for the others
+        return await self._validator_lookups.run(
+            validator_address, lambda: self._fetch_validator_name(validator_address, endpoint)
+        )
+
+    async def _fetch_validator_name(self, validator_address: str, endpoint: str) -> Optional[str]:
+        """Fetch validator moniker/name from REST API and cache it"""
         try:
             url = f"{endpoint}/cosmos/staking/v1beta1/validators/{validator_address}"
 
-            async with self.session.get(url) as response:
+            async with self._host_limit(url), self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     validator = data.get('validator', {})
                     description = validator.get('description', {})
-                    return description.get('moniker', 'Unknown')
+                    name = description.get('moniker', 'Unknown')
+
+                    self._remember_validator_name(validator_address, name, time.monotonic() + VALIDATOR_NAME_TTL)
+                    return name
 
         except Exception:
             pass
 
         return None
 
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        """Semaphore capping concurrent requests to the URL's host"""
+        return self._host_semaphores[urlsplit(url).netloc]
+
+    def _remember_validator_name(self, validator_address: str, name: str, expires_at: float):
+        """Cache a validator name, evicting the oldest entry when full"""
+        # Re-insert at the end so the oldest entries are evicted first
+        self._validator_names.pop(validator_address, None)
+        if len(self._validator_names) >= VALIDATOR_NAME_CACHE_SIZE:
+            del self._validator_names[next(iter(self._validator_names))]
+        self._validator_names[validator_address] = (expires_at, name)
+
+    async def _ensure_validator_set(self, endpoint: str):
+        """Load the endpoint's bonded validator names unless done within the TTL"""
+        # Join a load already in flight before looking at the due time, which is
+        # only set once a load finishes
+        if (not self._validator_set_loads.in_flight(endpoint)
+                and self._validator_sets_due.get(endpoint, 0.0) > time.monotonic()):
+            return
+
+        await self._validator_set_loads.run(endpoint, lambda: self._load_validator_set(endpoint))
+
+    async def _load_validator_set(self, endpoint: str):
+        """Fetch all bonded validators from REST API (paginated) and cache their names"""
+        url = f"{endpoint}/cosmos/staking/v1beta1/validators"
+        params = {'status': 'BOND_STATUS_BONDED', 'pagination.limit': str(VALIDATOR_SET_PAGE_SIZE)}
+        loaded = 0
+        try:
+            for _ in range(VALIDATOR_SET_MAX_PAGES):
+                async with self._host_limit(url), self.session.get(url, params=params) as response:
+                    if response.status != 200:
+                        logger.warning(f"Validator set API error: {response.status}")
+                        return
+                    data = orjson.loads(await response.read())
+
+                expires_at = time.monotonic() + VALIDATOR_NAME_TTL
+                for validator in data.get('validators', []):
+                    operator_address = validator.get('operator_address')
+                    if operator_address:
+                        name = validator.get('description', {}).get('moniker', 'Unknown')
+                        self._remember_validator_name(operator_address, name, expires_at)
+                        loaded += 1
+
+                next_key = (data.get('pagination') or {}).get('next_key')
+                if not next_key:
+                    break
+                params['pagination.key'] = next_key
+
+        except Exception as e:
+            logger.warning(f"Error fetching validator set from {endpoint}: {e}")
+        finally:
+            # Counted as done even if it fails - validators not found fall back to single lookups
+            self._validator_sets_due[endpoint] = time.monotonic() + VALIDATOR_NAME_TTL
+            logger.info(f"Cached {loaded} validator names from {endpoint}")
+
     def _is_native_token(self, denom: str, config: Dict) -> bool:
         """Check if denomination is the native token"""
-        # Native tokens usually start with 'u' followed by the token name
-        # Or they might be the exact token symbol in lowercase
+        return denom in self._native_denoms.get(config['token_symbol'], ())
+
+    @staticmethod
+    def _native_denoms_for(config: Dict) -> frozenset:
+        """
+        Denoms that count as a chain's native token
+        Usually 'u' + the lowercase symbol (uatom, uosmo, ...) or the bare symbol;
+        chains with another base denom (e.g. adym) set native_denom in config.json.
+        """
         token_symbol = config['token_symbol'].lower()
-
-        # Common patterns
-        if denom == f"u{token_symbol}":
-            return True
-        if denom == token_symbol:
-            return True
-        if denom == "uatom" and token_symbol == "atom":
-            return True
-        if denom == "uosmo" and token_symbol == "osmo":
-            return True
-        if denom == "utia" and token_symbol == "tia":
-            return True
-        if denom == "ujuno" and token_symbol == "juno":
-            return True
-        if denom == "uhuahua" and token_symbol == "huahua":
-            return True
-        if denom == "adym" and token_symbol == "dym":
-            return True
-
-        return False
+        denoms = {f"u{token_symbol}", token_symbol}
+        if config.get('native_denom'):
+            denoms.add(config['native_denom'])
+        return frozenset(denoms)
 
     async def analyze_addresses(self, addresses: List[str], price_fetcher=None, default_aprs: Dict[str, float] = None) -> List[WalletAnalysis]:
         """Analyze multiple wallet addresses"""
@@ -255,16 +479,11 @@ class WalletAddressAnalyzer:
 
         logger.info(f"Analyzing {len(addresses)} wallet addresses...")
 
-        results = []
-
-        # Process addresses concurrently with rate limiting
-        semaphore = asyncio.Semaphore(5)  # Max 5 concurrent requests
-
-        async def analyze_single_address(address):
-            async with semaphore:
-                return await self._analyze_single_address(address, price_fetcher, default_aprs)
-
-        tasks = [analyze_single_address(addr.strip()) for addr in addresses if addr.strip()]
+        # Process addresses concurrently - REST requests are rate limited per host
+        tasks = [
+            self._analyze_single_address(addr.strip(), price_fetcher, default_aprs)
+            for addr in addresses if addr.strip()
+        ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         # Filter out exceptions